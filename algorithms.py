@@ -0,0 +1,96 @@
+"""Registre des algorithmes de résolution et de leurs capacités.
+
+Chaque algorithme déclare s'il est exact (optimalité prouvée) ou approché,
+s'il exige des poids entiers, s'il respecte un budget de temps, s'il est
+précédé de la réduction de l'instance (reduction.py) et vers quel algorithme
+se replier en cas d'échec. Son moteur est désigné par 'module:fonction' et
+n'est importé, avec ses dépendances lourdes (Pyomo, multiprocessing...), qu'à
+la première résolution qui l'utilise: un processus qui n'exécute que le
+glouton ne les charge jamais.
+
+Les moteurs ont tous la signature
+    moteur(df, max_capacity, params, progress, timings, incumbent, resume, state, deadline)
+et retournent (indices choisis, statistiques); voir helpers._solve.
+"""
+import importlib
+
+
+class Algorithm:
+    """Algorithme déclaré au registre"""
+
+    def __init__(self, name, label, engine, exact, integer_weights=False, time_limit=False, reduced=False,
+                 fallback=None, fallback_on=Exception):
+        self.name = name
+        self.label = label
+        self.engine = engine
+        self.exact = exact
+        self.integer_weights = integer_weights
+        self.time_limit = time_limit
+        self.reduced = reduced
+        self.fallback = fallback
+        self.fallback_on = fallback_on
+        self._solver = None
+
+    def load(self):
+        """Fonction du moteur, importée au premier appel"""
+        if self._solver is None:
+            module, function = self.engine.split(':')
+            self._solver = getattr(importlib.import_module(module), function)
+        return self._solver
+
+    def capabilities(self):
+        """Capacités en clair (infobulle de la liste déroulante)"""
+        parts = ["exact" if self.exact else "approché"]
+        if self.integer_weights:
+            parts.append("poids entiers")
+        if self.time_limit:
+            parts.append("budget de temps")
+        if self.fallback:
+            parts.append(f"repli: {ALGORITHMS[self.fallback].label}")
+        return " · ".join(parts)
+
+
+# Dans l'ordre de la liste déroulante de l'interface
+ALGORITHMS = {}
+
+
+def register(algorithm):
+    """Ajoute (ou remplace) un algorithme du registre"""
+    ALGORITHMS[algorithm.name] = algorithm
+    return algorithm
+
+
+def get_algorithm(name):
+    """Algorithme `name` du registre; lève ValueError s'il est inconnu"""
+    try:
+        return ALGORITHMS[name]
+    except KeyError:
+        raise ValueError(f"algorithme inconnu: {name} (attendu: {', '.join(ALGORITHMS)})") from None
+
+
+def dropdown_options():
+    """Options de la liste déroulante des algorithmes"""
+    return [{'label': algorithm.label, 'value': name, 'title': algorithm.capabilities()}
+            for name, algorithm in ALGORITHMS.items()]
+
+
+register(Algorithm('dynamic', '🔍 Programmation Dynamique', 'helpers:_run_dynamic', exact=True,
+                   integer_weights=True, time_limit=True, reduced=True, fallback='exact', fallback_on=ValueError))
+# Programmation dynamique complète dont la dernière ligne donne l'optimum de chaque capacité (run_optimization)
+register(Algorithm('sweep', '📈 Balayage des Capacités (PD)', 'helpers:_run_dynamic', exact=True,
+                   integer_weights=True, time_limit=True, fallback='exact', fallback_on=ValueError))
+register(Algorithm('exact', '📐 Programmation Linéaire (GLPK)', 'helpers:_run_exact', exact=True,
+                   time_limit=True, reduced=True, fallback='greedy'))
+register(Algorithm('branch_bound', '🌳 Séparation et Évaluation', 'helpers:_run_branch_bound', exact=True,
+                   time_limit=True, reduced=True))
+register(Algorithm('genetic', '🧬 Algorithme Génétique', 'helpers:_run_genetic', exact=False,
+                   time_limit=True, reduced=True))
+register(Algorithm('genetic_islands', '🏝️ Génétique en Îles (multi-processus)', 'islands:run_islands',
+                   exact=False, time_limit=True, reduced=True))
+register(Algorithm('greedy', '🎯 Glouton (Heuristique)', 'helpers:_run_greedy', exact=False))
+register(Algorithm('greedy_best', '🥇 Glouton + Meilleur Objet (½-approx.)', 'helpers:_run_greedy_best',
+                   exact=False))
+register(Algorithm('fptas', '📏 Approximation (1-ε) (FPTAS)', 'helpers:_run_fptas', exact=False,
+                   time_limit=True, reduced=True, fallback='greedy_best', fallback_on=ValueError))
+register(Algorithm('portfolio', '🏁 Portefeuille Parallèle (auto)', 'portfolio:run_portfolio', exact=True,
+                   time_limit=True, reduced=True))
@@ -1,18 +1,41 @@
+import os
+import random
+
 import dash
-from dash import dcc, html, Input, Output, State
+from dash import callback_context, dcc, html, Input, Output, State
 from dash import dash_table
-import pandas as pd
+import numpy as np
 import plotly.graph_objects as go
 from dash.exceptions import PreventUpdate
-
-from helpers import generate_items, run_optimization, prepare_download_data
+from flask import Response, send_from_directory
+from plotly.io.json import to_json_plotly
+
+from algorithms import dropdown_options
+from cache import SolutionCache
+from config import (CACHE_DISK_MAX_ENTRIES, CACHE_PATH, CHART_BINS, CHART_MAX_POINTS,
+                    CHART_WEBGL_POINTS, DATASET_TTL, DATASETS_DIR, EXPORT_DIR, EXPORT_FORMAT, EXPORT_TTL,
+                    FPTAS_EPSILON, JOBS_CACHE_DIR, MAX_CONCURRENT_SOLVES, PROGRESS_INTERVAL,
+                    SERIALIZE_SAMPLE_RATE, TABLE_PAGE_SIZE)
+from datasets import DatasetExpired, DatasetRegistry, item_names, items_summary, row_changes
+from export import FORMATS, available_formats, export_results
+from helpers import frontier_selection, frontier_value, generate_columns, run_optimization
+from jobs import SolveSlots, create_background_manager, throttled
+from metrics import Metrics, timed
 
 
 class KnapsackApp:
     def __init__(self):
         self.app = dash.Dash(__name__, external_stylesheets=["custom.css"])
+        self.datasets = DatasetRegistry(DATASETS_DIR, DATASET_TTL)
+        self.background_manager, job_cache = create_background_manager(JOBS_CACHE_DIR)
+        self.solve_slots = SolveSlots(job_cache, MAX_CONCURRENT_SOLVES)
+        self.metrics = Metrics(job_cache)
+        # Chaque résolution a son propre processus (jobs.py): seul le niveau disque du cache sert d'une
+        # résolution à l'autre, le niveau mémoire est désactivé
+        self.solution_cache = SolutionCache(0, CACHE_PATH or None, CACHE_DISK_MAX_ENTRIES, self.metrics)
         self.setup_layout()
         self.setup_callbacks()
+        self.setup_routes()
 
     def setup_layout(self):
         self.app.layout = html.Div([
@@ -20,10 +43,23 @@ class KnapsackApp:
             self.create_configuration_panel(),
             dcc.Store(id='available_items_store'),
             dcc.Store(id='optimization_results_store'),
+            dcc.Store(id='resolve_request'),
             self.create_main_content(),
             self.create_action_panel(),
-            dcc.Download(id="download_data")
+            # Les exports sont servis par la route /exports (setup_routes): le navigateur y est envoyé
+            dcc.Location(id='download_location', refresh=True)
         ], className='app-container')
+        # Composants rendus par les callbacks (tableaux paginés, balayage des capacités), déclarés pour la
+        # validation des callbacks qui en dépendent
+        self.app.validation_layout = html.Div([
+            self.app.layout,
+            dash_table.DataTable(id='available_items_table'),
+            html.Div(id='available_items_table_stats'),
+            dash_table.DataTable(id='selected_items_table'),
+            html.Div(id='selected_items_table_stats'),
+            dcc.Slider(id='capacity_slider', min=0, max=1),
+            html.P(id='sweep_selection'),
+        ])
 
     def create_header(self):
         return html.Div([
@@ -36,22 +72,38 @@ class KnapsackApp:
         return html.Div([
             html.H3("⚙️ Configuration", className='section-title'),
             html.Div([
-                self.create_input_group("Nombre d'objets", 'num_items', 100, 1, 1000, "1-1000 objets"),
+                self.create_input_group("Nombre d'objets", 'num_items', 100, 1, 1_000_000, "1-1 000 000 objets"),
                 self.create_input_group("Capacité maximale", 'max_capacity', 50, 1, 500, "Poids maximum"),
                 self.create_input_group("Valeur maximale", 'max_value', 100, 1, 1000, "Par objet"),
+                self.create_input_group("Graine", 'seed', None, 0, 2 ** 31 - 1, "Vide: aléatoire"),
+                self.create_input_group("Budget de temps (s)", 'time_limit', None, 1, 3600,
+                                        "Vide: illimité (exacts et génétique)"),
+                html.Div([
+                    html.Label("Epsilon (approximation)", className='config-label'),
+                    dcc.Input(id='epsilon', type='number', value=FPTAS_EPSILON, min=0.001, max=0.5, step=0.001,
+                              debounce=True, className='config-input'),
+                    html.Small("Solution ≥ (1 - ε) × optimum", className='input-help')
+                ], className='config-group'),
                 html.Div([
                     html.Label("Algorithme", className='config-label'),
                     dcc.Dropdown(
                         id='algorithm_select',
-                        options=[
-                            {'label': '🔍 Programmation Dynamique', 'value': 'dynamic'},
-                            {'label': '🧬 Algorithme Génétique', 'value': 'genetic'},
-                            {'label': '🎯 Glouton (Heuristique)', 'value': 'greedy'}
-                        ],
+                        # Algorithmes du registre, avec leurs capacités en infobulle
+                        options=dropdown_options(),
                         value='dynamic',
                         className='config-dropdown'
                     ),
                 ], className='config-group'),
+                html.Div([
+                    html.Label("Format d'export", className='config-label'),
+                    dcc.Dropdown(
+                        id='export_format',
+                        options=[{'label': FORMATS[fmt][1], 'value': fmt} for fmt in available_formats()],
+                        value=EXPORT_FORMAT if EXPORT_FORMAT in available_formats() else 'jsonl.gz',
+                        clearable=False,
+                        className='config-dropdown'
+                    ),
+                ], className='config-group'),
             ], className='config-container'),
 
             html.Div([
@@ -63,7 +115,8 @@ class KnapsackApp:
     def create_input_group(self, label, input_id, default, min_val, max_val, help_text):
         return html.Div([
             html.Label(label, className='config-label'),
-            dcc.Input(id=input_id, type='number', value=default, min=min_val, max=max_val, step=1, className='config-input'),
+            dcc.Input(id=input_id, type='number', value=default, min=min_val, max=max_val, step=1, debounce=True,
+                      className='config-input'),
             html.Small(help_text, className='input-help')
         ], className='config-group')
 
@@ -83,7 +136,9 @@ class KnapsackApp:
         return html.Div([
             html.Button("🚀 Lancer l'Optimisation", id='optimize_button', n_clicks=0, className='success-button', style={'display': 'none'}),
             html.Button("📊 Afficher Statistiques", id='stats_button', n_clicks=0, className='info-button', style={'display': 'none'}),
-            html.Button("⬇️ Télécharger Résultats", id='download_button', n_clicks=0, className='download-button', style={'display': 'none'})
+            html.Button("⬇️ Télécharger Résultats", id='download_button', n_clicks=0, className='download-button', style={'display': 'none'}),
+            html.Button("⛔ Annuler", id='cancel_button', n_clicks=0, className='secondary-button', style={'display': 'none'}),
+            html.Div(id='optimization_progress', className='progress-message', style={'display': 'none'})
         ], className='action-panel')
 
     def setup_callbacks(self):
@@ -94,62 +149,223 @@ class KnapsackApp:
             Input('generate_button', 'n_clicks'),
             [State('num_items', 'value'),
              State('max_capacity', 'value'),
-             State('max_value', 'value')],
+             State('max_value', 'value'),
+             State('seed', 'value')],
             prevent_initial_call=True
         )
-        def generate_and_display_items(n_clicks, num_items, max_capacity, max_value):
+        def generate_and_display_items(n_clicks, num_items, max_capacity, max_value, seed):
             if not n_clicks:
                 raise PreventUpdate
-            df = generate_items(num_items, max_capacity, max_value)
-            data = df.to_dict('records')
-            table = self.create_items_table(data, "available_items_table", "Objets Disponibles")
-            return data, table, {'display': 'block', 'margin': '10px'}
+            # Graine tirée puis affichée si non fournie, pour pouvoir reproduire le jeu
+            if seed is None:
+                seed = int(np.random.default_rng().integers(2 ** 31))
+            columns = generate_columns(num_items, max_capacity, max_value, seed)
+            # Les objets restent côté serveur: le Store ne reçoit que l'id et le résumé
+            dataset = dict(self.datasets.put_items(columns), seed=seed)
+            dataset['root_id'] = dataset['dataset_id']
+            rows, page_count = self.datasets.page(dataset['dataset_id'], 0, TABLE_PAGE_SIZE)
+            table = self.create_items_table(dataset, rows, page_count, "available_items_table", "Objets Disponibles")
+            return dataset, table, {'display': 'block', 'margin': '10px'}
 
         @self.app.callback(
             [Output('optimization_results_container', 'children'),
              Output('optimization_results_store', 'data'),
              Output('download_button', 'style'),
              Output('stats_button', 'style')],
-            Input('optimize_button', 'n_clicks'),
+            [Input('optimize_button', 'n_clicks'),
+             Input('resolve_request', 'data')],
             [State('available_items_store', 'data'),
              State('max_capacity', 'value'),
-             State('algorithm_select', 'value')],
+             State('algorithm_select', 'value'),
+             State('time_limit', 'value'),
+             State('epsilon', 'value'),
+             State('optimization_results_store', 'data')],
+            background=True,
+            manager=self.background_manager,
+            progress=[Output('optimization_progress', 'children')],
+            running=[
+                (Output('optimize_button', 'disabled'), True, False),
+                (Output('cancel_button', 'style'), {'display': 'inline-block', 'margin': '10px'}, {'display': 'none'}),
+                (Output('optimization_progress', 'style'), {'display': 'block'}, {'display': 'none'}),
+            ],
+            cancel=[Input('cancel_button', 'n_clicks')],
+            prevent_initial_call=True
+        )
+        def run_optimization_callback(set_progress, n_clicks, resolve_request, dataset, max_capacity, algorithm,
+                                      time_limit, epsilon, previous_results):
+            if not dataset:
+                raise PreventUpdate
+            if callback_context.triggered_id == 'resolve_request':
+                if not resolve_request or resolve_request['dataset_id'] != dataset['dataset_id']:
+                    raise PreventUpdate
+            elif not n_clicks:
+                raise PreventUpdate
+            try:
+                items = self.datasets.get_items(dataset['dataset_id'], names=False)
+            except DatasetExpired:
+                return self.expired_message(), None, {'display': 'none'}, {'display': 'none'}
+            previous = self.load_previous(previous_results, dataset, max_capacity)
+            report = throttled(lambda info: set_progress(self.format_progress(info)), PROGRESS_INTERVAL)
+            set_progress("⏳ Démarrage de l'optimisation...")
+            params = {'epsilon': epsilon or FPTAS_EPSILON} if algorithm == 'fptas' else None
+            with self.solve_slots.acquire(on_wait=lambda: set_progress("⏳ En attente d'un emplacement de calcul...")):
+                results = run_optimization(items, max_capacity, algorithm, params=params, cache=self.solution_cache,
+                                           progress=report, records=False, previous=previous, keep_state=True,
+                                           time_limit=time_limit)
+            summary = results['summary']
+            # Le Store ne reçoit que les ids du jeu, de la sélection et de l'état DP, et les résumés
+            store = {
+                'dataset_id': dataset['dataset_id'],
+                'root_id': dataset.get('root_id'),
+                'capacity': max_capacity,
+                'selection_id': self.datasets.put({'chosen': results['chosen']}),
+                'state_id': self.datasets.put(results['state']) if results['state'] else None,
+                'frontier_id': self.datasets.put(results['frontier']) if results['frontier'] else None,
+                'summary': summary,
+                'selected_summary': items_summary(items.iloc[results['chosen']]),
+            }
+            # Construction des composants; Dash encode ensuite la réponse lui-même, si bien que la
+            # sérialisation JSON n'est mesurée (par un second encodage) que sur un échantillon des réponses
+            response_timings = {}
+            with timed(response_timings, 'render'):
+                table = self.create_results_table(store)
+                style = {'display': 'block', 'margin': '10px'}
+                outputs = [table, store, style, style]
+            if random.random() < SERIALIZE_SAMPLE_RATE:
+                with timed(response_timings, 'serialize'):
+                    to_json_plotly(outputs)
+            self.metrics.record_solve(summary)
+            for phase, seconds in response_timings.items():
+                self.metrics.observe('knapsack_phase_seconds', seconds,
+                                     {'phase': phase, 'algorithm': summary['algorithm']})
+            return outputs
+
+        @self.app.callback(
+            [Output('available_items_store', 'data', allow_duplicate=True),
+             Output('available_items_table_stats', 'children')],
+            Input('available_items_table', 'data_timestamp'),
+            [State('available_items_table', 'data'),
+             State('available_items_table', 'data_previous'),
+             State('available_items_store', 'data')],
+            prevent_initial_call=True
+        )
+        def apply_item_edits(timestamp, rows, previous_rows, dataset):
+            if not dataset or not rows or not previous_rows:
+                raise PreventUpdate
+            changes = row_changes(rows, previous_rows)
+            if not changes:
+                raise PreventUpdate
+            try:
+                dataset = self.datasets.edit_items(dataset, changes)
+            except DatasetExpired:
+                raise PreventUpdate
+            if dataset is None:
+                raise PreventUpdate
+            return dataset, self.items_stats(dataset)
+
+        @self.app.callback(
+            Output('resolve_request', 'data'),
+            [Input('available_items_store', 'data'),
+             Input('max_capacity', 'value')],
+            State('optimization_results_store', 'data'),
+            prevent_initial_call=True
+        )
+        def request_resolve(dataset, max_capacity, results):
+            # Ré-optimisation après modification d'objets ou de capacité d'une instance déjà résolue
+            if not dataset or not results or max_capacity is None or dataset.get('root_id') != results.get('root_id'):
+                raise PreventUpdate
+            if dataset['dataset_id'] == results['dataset_id'] and max_capacity == results['capacity']:
+                raise PreventUpdate
+            return {'dataset_id': dataset['dataset_id'], 'capacity': max_capacity}
+
+        @self.app.callback(
+            [Output('available_items_table', 'data'),
+             Output('available_items_table', 'page_count'),
+             Output('available_items_table', 'page_current')],
+            [Input('available_items_table', 'page_current'),
+             Input('available_items_table', 'page_size'),
+             Input('available_items_table', 'sort_by'),
+             Input('available_items_table', 'filter_query')],
+            State('available_items_store', 'data'),
+            prevent_initial_call=True
+        )
+        def page_available_items(page_current, page_size, sort_by, filter_query, dataset):
+            if not dataset:
+                raise PreventUpdate
+            return self.table_page(dataset['dataset_id'], None, page_current, page_size, sort_by, filter_query)
+
+        @self.app.callback(
+            [Output('selected_items_table', 'data'),
+             Output('selected_items_table', 'page_count'),
+             Output('selected_items_table', 'page_current')],
+            [Input('selected_items_table', 'page_current'),
+             Input('selected_items_table', 'page_size'),
+             Input('selected_items_table', 'sort_by'),
+             Input('selected_items_table', 'filter_query')],
+            State('optimization_results_store', 'data'),
             prevent_initial_call=True
         )
-        def run_optimization_callback(n_clicks, items_data, max_capacity, algorithm):
-            if not n_clicks or not items_data:
+        def page_selected_items(page_current, page_size, sort_by, filter_query, results):
+            if not results:
                 raise PreventUpdate
-            results = run_optimization(items_data, max_capacity, algorithm)
-            table = self.create_results_table(results)
-            charts = self.create_optimization_charts(results, items_data, max_capacity)
-            style = {'display': 'block', 'margin': '10px'}
-            return table, results, style, style
+            return self.table_page(results['dataset_id'], results['selection_id'],
+                                   page_current, page_size, sort_by, filter_query)
 
         @self.app.callback(
-            Output('download_data', 'data'),
+            Output('download_location', 'href'),
             Input('download_button', 'n_clicks'),
-            [State('available_items_store', 'data'),
-             State('optimization_results_store', 'data'),
-             State('max_capacity', 'value')],
+            [State('optimization_results_store', 'data'),
+             State('export_format', 'value')],
             prevent_initial_call=True
         )
-        def download_results(n_clicks, items, results, capacity):
-            if not n_clicks:
+        def download_results(n_clicks, results, fmt):
+            if not n_clicks or not results:
+                raise PreventUpdate
+            export_timings = {}
+            try:
+                with timed(export_timings, 'export'):
+                    # Écrit au premier téléchargement du résultat dans ce format, relu ensuite
+                    columns = self.datasets.get(results['dataset_id'])
+                    header = {'configuration': {'max_capacity': results['capacity'], 'total_items': len(columns['id'])},
+                              'summary': results['summary']}
+                    path = export_results(EXPORT_DIR, results['selection_id'], columns,
+                                          self.datasets.get(results['selection_id'])['chosen'], header, fmt,
+                                          EXPORT_TTL)
+                    # Le numéro de clic rend l'adresse unique: chaque clic relance le téléchargement
+                    href = self.app.get_relative_path(f"/exports/{os.path.basename(path)}?download={n_clicks}")
+            except DatasetExpired:
                 raise PreventUpdate
-            return prepare_download_data(items, results, capacity)
+            algorithm = results['summary']['algorithm']
+            self.metrics.observe('knapsack_phase_seconds', export_timings['export'],
+                                 {'phase': 'export', 'algorithm': algorithm})
+            return href
         
         @self.app.callback(
             Output('optimization_charts_container', 'children'),
             Input('stats_button', 'n_clicks'),
-            [State('optimization_results_store', 'data'),
-            State('available_items_store', 'data'),
-            State('max_capacity', 'value')],
+            State('optimization_results_store', 'data'),
             prevent_initial_call=True
         )
-        def show_stats_callback(n_clicks, results, items_data, max_capacity):
+        def show_stats_callback(n_clicks, results):
             if n_clicks == 0 or not results:
                 raise PreventUpdate
-            return self.create_optimization_charts(results, items_data, max_capacity)
+            try:
+                return self.create_optimization_charts(results)
+            except DatasetExpired:
+                return self.expired_message()
+
+        @self.app.callback(
+            Output('sweep_selection', 'children'),
+            Input('capacity_slider', 'value'),
+            State('optimization_results_store', 'data'),
+            prevent_initial_call=True
+        )
+        def show_sweep_selection(capacity, results):
+            # Lecture sur la courbe précalculée: aucune nouvelle résolution
+            frontier = self.load_frontier(results)
+            if capacity is None or frontier is None:
+                raise PreventUpdate
+            return self.sweep_text(results, frontier, capacity)
 
         @self.app.callback(
             [Output('available_items_store', 'data', allow_duplicate=True),
@@ -165,30 +381,127 @@ class KnapsackApp:
                 raise PreventUpdate
             return None, None, "", "", ""
 
-    def create_items_table(self, data, table_id, title):
-        if not data:
+    def setup_routes(self):
+        @self.app.server.route('/metrics')
+        def metrics():
+            """Durées par phase et compteurs de résolution au format Prometheus"""
+            return Response(self.metrics.render(), mimetype='text/plain; version=0.0.4')
+
+        @self.app.server.route('/exports/<name>')
+        def exports(name):
+            """Fichier d'export, envoyé tel quel depuis le disque (sans encodage base64 dans la réponse Dash)"""
+            return send_from_directory(os.path.abspath(EXPORT_DIR), name, as_attachment=True)
+
+    def load_results(self, results, names=True):
+        """Objets et objets sélectionnés d'un résultat stocké; lève DatasetExpired"""
+        items = self.datasets.get_items(results['dataset_id'], names)
+        chosen = self.datasets.get(results['selection_id'])['chosen']
+        return items, items.iloc[chosen]
+
+    def load_frontier(self, results):
+        """Courbe valeur optimale / capacité d'un résultat en mode balayage (None sinon ou si expirée)"""
+        if not results or not results.get('frontier_id'):
+            return None
+        try:
+            return self.datasets.get(results['frontier_id'])
+        except DatasetExpired:
+            return None
+
+    def sweep_text(self, results, frontier, capacity):
+        """Optimum et sélection à une capacité du balayage, reconstruite depuis l'état DP s'il est conservé"""
+        text = f"📈 Capacité {capacity}: valeur optimale {frontier_value(frontier, capacity):.1f}"
+        try:
+            state = self.datasets.get(results['state_id']) if results.get('state_id') else None
+        except DatasetExpired:
+            state = None
+        if state is not None:
+            chosen = frontier_selection(state, capacity)
+            text += f" | poids {state['weights'][chosen].sum():.1f} | {len(chosen)} objets"
+        return text
+
+    def sweep_panel(self, results):
+        """Curseur de capacité lisant la courbe précalculée du mode balayage"""
+        if not results.get('frontier_id'):
+            return None
+        capacity = results['summary']['sweep']['capacity']
+        return html.Div([
+            html.Label("Capacité (lecture de la courbe précalculée)", className='config-label'),
+            dcc.Slider(id='capacity_slider', min=0, max=capacity, step=1, value=capacity, marks=None,
+                       updatemode='drag', tooltip={'placement': 'bottom', 'always_visible': True}),
+            html.P(self.sweep_text(results, self.load_frontier(results), capacity), id='sweep_selection'),
+        ], className='config-group')
+
+    def load_previous(self, results, dataset, max_capacity):
+        """Résolution précédente d'une version du même jeu, au format attendu par run_optimization.
+
+        None si les objets et la capacité n'ont pas changé depuis cette
+        résolution: une nouvelle demande (autre algorithme, paramètres) est
+        alors résolue par le moteur choisi, sans reprise.
+        """
+        if not results or results.get('root_id') != dataset.get('root_id'):
+            return None
+        if results['dataset_id'] == dataset['dataset_id'] and results['capacity'] == max_capacity:
+            return None
+        try:
+            items = self.datasets.get_items(results['dataset_id'], names=False)
+            state = self.datasets.get(results['state_id']) if results.get('state_id') else None
+            return {
+                'weights': items['weight'].to_numpy(dtype=float),
+                'values': items['value'].to_numpy(dtype=float),
+                'capacity': results['capacity'],
+                'chosen': self.datasets.get(results['selection_id'])['chosen'],
+                'optimal': results['summary'].get('optimal', False),
+                'algorithm': results['summary']['algorithm'],
+                'state': state,
+            }
+        except DatasetExpired:
+            return None
+
+    def table_page(self, dataset_id, selection_id, page_current, page_size, sort_by, filter_query):
+        """Page demandée par un DataTable; un nouveau tri ou filtre ramène à la première page"""
+        triggered = [trigger['prop_id'] for trigger in callback_context.triggered]
+        if any(prop.endswith(('.sort_by', '.filter_query')) for prop in triggered):
+            page_current = 0
+        try:
+            rows, page_count = self.datasets.page(dataset_id, page_current or 0, page_size, selection_id,
+                                                  sort_by, filter_query)
+        except DatasetExpired:
+            raise PreventUpdate
+        return rows, page_count, page_current or 0
+
+    def expired_message(self):
+        return html.Div("⌛ Les objets ont expiré côté serveur: générez-les à nouveau.",
+                        className='no-data-message')
+
+    def create_items_table(self, summary, rows, page_count, table_id, title):
+        """Tableau paginé côté serveur: seule la première page est envoyée au navigateur"""
+        if not summary or not summary['num_items']:
             return html.Div("Aucun objet généré", className='no-data-message')
 
-        df = pd.DataFrame(data)
-        stats = html.Div([
-            html.P(f"📊 {len(df)} objets | Poids total: {df['weight'].sum():.1f} | Valeur totale: {df['value'].sum():.1f}"),
-            html.P(f"💰 Ratio moyen V/P: {(df['value'] / df['weight']).mean():.2f}")
-        ], className='table-stats')
+        # Statistiques calculées une seule fois, à l'enregistrement du jeu
+        stats = html.Div(self.items_stats(summary), id=f'{table_id}_stats', className='table-stats')
 
         table = dash_table.DataTable(
             id=table_id,
-            data=data,
+            data=rows,
             columns=[
-                {'name': 'ID', 'id': 'id'},
-                {'name': 'Nom', 'id': 'name'},
+                {'name': 'ID', 'id': 'id', 'editable': False},
+                {'name': 'Nom', 'id': 'name', 'editable': False},
                 {'name': 'Poids', 'id': 'weight', 'type': 'numeric', 'format': {'specifier': '.1f'}},
                 {'name': 'Valeur', 'id': 'value', 'type': 'numeric', 'format': {'specifier': '.1f'}},
-                {'name': 'Ratio V/P', 'id': 'ratio', 'type': 'numeric', 'format': {'specifier': '.2f'}}
+                {'name': 'Ratio V/P', 'id': 'ratio', 'type': 'numeric', 'format': {'specifier': '.2f'},
+                 'editable': False}
             ],
             editable=True,
-            sort_action="native",
-            filter_action="native",
-            page_size=15,
+            page_action='custom',
+            page_current=0,
+            page_size=TABLE_PAGE_SIZE,
+            page_count=page_count,
+            sort_action='custom',
+            sort_mode='single',
+            sort_by=[],
+            filter_action='custom',
+            filter_query='',
             style_table={'overflowX': 'auto'},
             style_cell={'textAlign': 'left', 'padding': '10px'},
             style_header={'backgroundColor': '#f8f9fa', 'fontWeight': 'bold'},
@@ -217,13 +530,23 @@ class KnapsackApp:
             optimization_button if optimization_button else None,
         ], className='table-container')
 
+    def items_stats(self, summary):
+        """Lignes de statistiques d'un jeu d'objets"""
+        stats = [
+            html.P(f"📊 {summary['num_items']} objets | Poids total: {summary['total_weight']:.1f} | Valeur totale: {summary['total_value']:.1f}"),
+            html.P(f"💰 Ratio moyen V/P: {summary['mean_ratio']:.2f}"),
+        ]
+        if 'seed' in summary:
+            stats.append(html.P(f"🎲 Graine: {summary['seed']}"
+                                + (f" ({summary['edits']} modification(s))" if summary.get('edits') else "")))
+        return stats
+
     def create_results_table(self, results):
         """Crée le tableau des résultats d'optimisation"""
-        if not results or 'selected_items' not in results:
+        if not results:
             return html.Div("Aucun résultat disponible", className='no-data-message')
 
-        selected_items = results['selected_items']
-        summary = results.get('summary', {})
+        summary = results['summary']
 
         # Résumé des résultats
         summary_component = html.Div([
@@ -238,14 +561,19 @@ class KnapsackApp:
                     html.P("Poids Total", className='metric-label')
                 ], className='metric-card'),
                 html.Div([
-                    html.H4(f"{len(selected_items)}", className='metric-value'),
+                    html.H4(f"{summary['num_selected']}", className='metric-value'),
                     html.P("Objets Sélectionnés", className='metric-label')
                 ], className='metric-card'),
                 html.Div([
                     html.H4(f"{summary.get('efficiency', 0):.1f}%", className='metric-value'),
                     html.P("Efficacité", className='metric-label')
                 ], className='metric-card'),
+                *self.guarantee_cards(summary),
+                *self.bound_cards(summary),
+                *self.portfolio_cards(summary),
+                *self.reduction_cards(summary),
             ], className='metrics-container'),
+            self.sweep_panel(results),
             html.Div([
                 html.Button(
                     "⬇️ Télécharger Résultats",
@@ -265,45 +593,130 @@ class KnapsackApp:
         ])
 
         # Tableau des objets sélectionnés
-        selected_table = self.create_items_table(selected_items, "selected_items_table", "Objets Sélectionnés")
+        rows, page_count = self.datasets.page(results['dataset_id'], 0, TABLE_PAGE_SIZE, results['selection_id'])
+        selected_table = self.create_items_table(results['selected_summary'], rows, page_count,
+                                                 "selected_items_table", "Objets Sélectionnés")
 
         return html.Div([selected_table, summary_component])
 
+    def format_progress(self, info):
+        """Texte d'avancement d'une résolution en cours"""
+        parts = []
+        if 'engine' in info:
+            parts.append(f"🏁 {info['engine']}")
+        if 'island' in info:
+            parts.append(f"Île {info['island']}")
+        if 'generation' in info:
+            parts.append(f"Génération {info['generation']}/{info['generations']}")
+        if 'items' in info:
+            parts.append(f"Objets traités {info['items']}/{info['num_items']}")
+        if 'nodes' in info:
+            parts.append(f"{info['nodes']} nœuds explorés")
+        if info.get('best_value') is not None:
+            parts.append(f"meilleure valeur {info['best_value']:.1f}")
+        if info.get('bound') is not None:
+            parts.append(f"borne {info['bound']:.1f}")
+            if info.get('best_value') is not None and info['bound'] > 0:
+                parts.append(f"écart {max(info['bound'] - info['best_value'], 0) / info['bound']:.2%}")
+        if info.get('elapsed') is not None:
+            budget = f"/{info['time_limit']:g}" if info.get('time_limit') else ""
+            parts.append(f"{info['elapsed']:.1f}{budget} s")
+        return "⏳ " + " | ".join(parts)
+
+    def bound_cards(self, summary):
+        """Borne supérieure et écart, affichés quand l'optimalité n'est pas prouvée"""
+        if summary.get('optimal') or summary.get('upper_bound') is None:
+            return []
+        label = "Écart à la borne (budget écoulé)" if summary.get('timed_out') else "Écart à la borne"
+        return [self.metric_card("Borne Supérieure", f"{summary['upper_bound']:.1f}"),
+                self.metric_card(label, f"{summary['gap']:.2%}")]
+
+    def guarantee_cards(self, summary):
+        """Garantie d'approximation (1 - ε) du mode FPTAS, à côté de la valeur atteinte"""
+        if summary.get('epsilon') is None:
+            return []
+        guarantee = summary.get('guarantee')
+        text = f"≥ {guarantee:.1%} de l'optimum" if guarantee is not None else "aucune (budget écoulé)"
+        return [self.metric_card(f"Garantie (ε = {summary['epsilon']:g})", text)]
+
+    def portfolio_cards(self, summary):
+        """Moteur gagnant du mode portefeuille et moteur ayant prouvé l'optimalité"""
+        if 'winner' not in summary:
+            return []
+        cards = [self.metric_card("Moteur Gagnant", f"{summary['winner']} ({summary['winner_time']:.2f} s)")]
+        if summary.get('proved_by'):
+            cards.append(self.metric_card("Optimalité Prouvée par", summary['proved_by']))
+        return cards
+
+    def reduction_cards(self, summary):
+        """Part des objets éliminés par la réduction avant résolution"""
+        reduction = summary.get('reduction')
+        if not reduction or not reduction.get('applied'):
+            return []
+        return [self.metric_card("Objets Éliminés (réduction)",
+                                 f"{reduction['eliminated']:.1%} (noyau: {reduction['core']})")]
+
     def metric_card(self, label, value):
         return html.Div([
             html.H4(value, className='metric-value'),
             html.P(label, className='metric-label')
         ], className='metric-card')
 
-    def create_optimization_charts(self, results, all_items, max_capacity):
-        if not results:
-            return html.Div()
-
+    def create_optimization_charts(self, results):
+        """Graphiques d'un résultat: construits au premier affichage puis servis depuis le registre (par résultat)"""
+        figures = self.datasets.derived(results['selection_id'], 'charts',
+                                        lambda: [figure.to_dict() for figure in self.build_charts(results)])
+        return html.Div([dcc.Graph(figure=figure) for figure in figures], className='charts-container')
+
+    def build_charts(self, results):
+        """Figures d'un résultat; leur taille reste bornée quel que soit le nombre d'objets"""
+        items, selected = self.load_results(results, names=False)
+        summary = results['summary']
+        max_capacity = results['capacity']
         charts = []
 
-        df_all = pd.DataFrame(all_items)
-        df_selected = pd.DataFrame(results['selected_items'])
-
         fig_scatter = go.Figure()
-        fig_scatter.add_trace(go.Scatter(
-            x=df_all['weight'], y=df_all['value'],
-            mode='markers', name='Non sélectionnés',
-            marker=dict(color='lightgray', size=8),
-            text=df_all['name'],
-            hovertemplate='<b>%{text}</b><br>Poids: %{x}<br>Valeur: %{y}<extra></extra>'
-        ))
-        fig_scatter.add_trace(go.Scatter(
-            x=df_selected['weight'], y=df_selected['value'],
-            mode='markers', name='Sélectionnés',
-            marker=dict(color="#28a745", size=12),
-            text=df_selected['name'],
-            hovertemplate='<b>%{text}</b><br>Poids: %{x}<br>Valeur: %{y}<extra></extra>'
+        if len(items) <= CHART_MAX_POINTS:
+            # Au-delà de CHART_WEBGL_POINTS, rendu WebGL et survol sans les noms
+            scatter = go.Scatter if len(items) <= CHART_WEBGL_POINTS else go.Scattergl
+            named = scatter is go.Scatter
+            hover = ('<b>%{text}</b><br>' if named else '') + 'Poids: %{x}<br>Valeur: %{y}<extra></extra>'
+            fig_scatter.add_trace(scatter(
+                x=items['weight'], y=items['value'],
+                mode='markers', name='Non sélectionnés',
+                marker=dict(color='lightgray', size=8 if named else 5),
+                text=item_names(items['id']) if named else None,
+                hovertemplate=hover
+            ))
+        else:
+            # Densité des objets, agrégée côté serveur en CHART_BINS x CHART_BINS cases
+            counts, x_edges, y_edges = np.histogram2d(items['weight'], items['value'], bins=CHART_BINS)
+            fig_scatter.add_trace(go.Heatmap(
+                x=(x_edges[:-1] + x_edges[1:]) / 2, y=(y_edges[:-1] + y_edges[1:]) / 2,
+                z=np.where(counts.T > 0, counts.T, np.nan), colorscale='Greys', name='Objets',
+                colorbar=dict(title='Objets'),
+                hovertemplate='Poids: %{x:.1f}<br>Valeur: %{y:.1f}<br>Objets: %{z}<extra></extra>'
+            ))
+            scatter, named = go.Scattergl, False
+
+        name = 'Sélectionnés'
+        if len(selected) > CHART_MAX_POINTS:
+            # Échantillon reproductible des objets sélectionnés
+            sample = np.sort(np.random.default_rng(0).choice(len(selected), CHART_MAX_POINTS, replace=False))
+            name = f"Sélectionnés (échantillon de {CHART_MAX_POINTS} sur {len(selected)})"
+            selected = selected.iloc[sample]
+        fig_scatter.add_trace(scatter(
+            x=selected['weight'], y=selected['value'],
+            mode='markers', name=name,
+            marker=dict(color="#28a745", size=12 if named else 6),
+            text=item_names(selected['id']) if named else None,
+            hovertemplate=('<b>%{text}</b><br>' if named else '') + 'Poids: %{x}<br>Valeur: %{y}<extra></extra>'
         ))
         fig_scatter.update_layout(title="Distribution Valeur vs Poids", xaxis_title="Poids", yaxis_title="Valeur")
 
-        charts.append(dcc.Graph(figure=fig_scatter))
+        charts.append(fig_scatter)
 
-        used_capacity = results.get('summary', {}).get('total_weight', 0)
+        used_capacity = summary.get('total_weight', 0)
         fig_gauge = go.Figure(go.Indicator(
             mode="gauge+number+delta",
             value=used_capacity,
@@ -322,9 +735,40 @@ class KnapsackApp:
             },
             title={'text': "Utilisation de la Capacité"}
         ))
-        charts.append(dcc.Graph(figure=fig_gauge))
-
-        return html.Div(charts, className='charts-container')
+        charts.append(fig_gauge)
+
+        if summary.get('traces'):
+            # Convergence de chaque île du modèle génétique en îles
+            fig_traces = go.Figure()
+            for island, trace in enumerate(summary['traces']):
+                generations, best = zip(*trace) if trace else ((), ())
+                fig_traces.add_trace(go.Scatter(x=generations, y=best, mode='lines', name=f"Île {island}"))
+            fig_traces.update_layout(title="Convergence par Île", xaxis_title="Génération",
+                                     yaxis_title="Meilleure valeur")
+            charts.append(fig_traces)
+
+        frontier = self.load_frontier(results)
+        if frontier is not None:
+            # Courbe en escalier: l'optimum ne change qu'aux capacités des paliers
+            capacity = summary['sweep']['capacity']
+            steps, best = frontier['capacity'], frontier['value']
+            if len(steps) > CHART_MAX_POINTS:
+                # Trop de paliers: courbe lue sur une grille régulière de capacités
+                grid = np.unique(np.linspace(0, capacity, CHART_MAX_POINTS).round().astype(np.int64))
+                steps, best = grid, best[np.searchsorted(steps, grid, side='right') - 1]
+            fig_frontier = go.Figure(go.Scatter(
+                x=np.append(steps, capacity), y=np.append(best, best[-1]), mode='lines', line_shape='hv',
+                name='Valeur optimale', hovertemplate='Capacité: %{x}<br>Valeur optimale: %{y}<extra></extra>'
+            ))
+            fig_frontier.add_trace(go.Scatter(
+                x=[capacity], y=[frontier_value(frontier, capacity)], mode='markers',
+                name='Capacité courante', marker=dict(color="#28a745", size=12)
+            ))
+            fig_frontier.update_layout(title="Valeur Optimale selon la Capacité", xaxis_title="Capacité",
+                                       yaxis_title="Valeur optimale")
+            charts.append(fig_frontier)
+
+        return charts
 
     def run_server(self, debug=True, port=8050):
         self.app.run_server(debug=debug, port=port)
@@ -0,0 +1,113 @@
+"""Résolution en lot d'instances JSONL, sans interface Dash.
+
+Chaque ligne d'entrée est un objet JSON décrivant une instance:
+
+    {"id": "a1", "capacity": 50, "items": [{"id": 1, "weight": 3, "value": 7}, ...]}
+    {"id": "a2", "capacity": 50, "weights": [3, 4], "values": [7, 9], "algorithm": "genetic"}
+
+Les champs `algorithm`, `params` et `time_limit` (budget en secondes) sont optionnels. Une ligne de résultat est
+écrite par instance, dans l'ordre de fin de calcul, avec la durée de résolution.
+
+Usage: python batch.py instances.jsonl -o resultats.jsonl --algorithm dynamic --workers 4
+"""
+import argparse
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+import json
+import os
+import sys
+import time
+
+from helpers import diagnostics_to_stderr, run_optimization
+
+
+def _items_from_instance(instance):
+    """Liste d'objets au format de run_optimization"""
+    if 'items' in instance:
+        return [dict(item, id=item.get('id', i + 1)) for i, item in enumerate(instance['items'])]
+    return [{'id': i + 1, 'weight': weight, 'value': value}
+            for i, (weight, value) in enumerate(zip(instance['weights'], instance['values']))]
+
+
+def _json_default(value):
+    """Convertit les scalaires NumPy présents dans les résumés"""
+    return value.item()
+
+
+def solve_instance(line_number, line, algorithm, time_limit=None):
+    """Résout une ligne JSONL; retourne le dict de résultat (ou d'erreur)"""
+    start = time.perf_counter()
+    instance_id = line_number
+    try:
+        instance = json.loads(line)
+        instance_id = instance.get('id', line_number)
+        capacity = instance.get('capacity', instance.get('max_capacity'))
+        items = _items_from_instance(instance)
+        results = run_optimization(items, capacity, instance.get('algorithm', algorithm),
+                                   params=instance.get('params'), records=False,
+                                   time_limit=instance.get('time_limit', time_limit))
+        return {
+            'id': instance_id,
+            'line': line_number,
+            'summary': results['summary'],
+            'selected_ids': [items[i]['id'] for i in results['chosen'].tolist()],
+            'elapsed': round(time.perf_counter() - start, 6),
+        }
+    except Exception as e:
+        return {
+            'id': instance_id,
+            'line': line_number,
+            'error': str(e),
+            'elapsed': round(time.perf_counter() - start, 6),
+        }
+
+
+def solve_stream(lines, algorithm='dynamic', workers=None, max_pending=None, time_limit=None):
+    """Résout un flux de lignes JSONL dans un pool de processus.
+
+    Au plus `max_pending` instances sont en vol à la fois, si bien que la
+    mémoire reste constante quelle que soit la taille du flux. Les résultats
+    sont produits dans l'ordre de fin de calcul. Les diagnostics des moteurs
+    vont sur la sortie d'erreur (diagnostics_to_stderr).
+    """
+    workers = workers or os.cpu_count() or 1
+    max_pending = max_pending or 2 * workers
+    with ProcessPoolExecutor(max_workers=workers, initializer=diagnostics_to_stderr) as executor:
+        pending = set()
+        for line_number, line in enumerate(lines, start=1):
+            if not line.strip():
+                continue
+            pending.add(executor.submit(solve_instance, line_number, line, algorithm, time_limit))
+            if len(pending) >= max_pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Résolution en lot d'instances de sac à dos (JSONL)")
+    parser.add_argument('input', nargs='?', default='-', help="fichier JSONL ('-' pour l'entrée standard)")
+    parser.add_argument('-o', '--output', default='-', help="fichier de résultats ('-' pour la sortie standard)")
+    parser.add_argument('-a', '--algorithm', default='dynamic', help="algorithme par défaut")
+    parser.add_argument('-w', '--workers', type=int, default=None, help="nombre de processus")
+    parser.add_argument('-t', '--time-limit', type=float, default=None, help="budget de temps par instance (s)")
+    args = parser.parse_args(argv)
+
+    source = sys.stdin if args.input == '-' else open(args.input, encoding='utf-8')
+    target = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8')
+    try:
+        for result in solve_stream(source, args.algorithm, args.workers, time_limit=args.time_limit):
+            target.write(json.dumps(result, ensure_ascii=False, default=_json_default) + '\n')
+            target.flush()
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if target is not sys.stdout:
+            target.close()
+
+
+if __name__ == '__main__':
+    main()
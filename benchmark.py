@@ -0,0 +1,262 @@
+"""Banc d'essai des algorithmes sur les classes d'instances difficiles de Pisinger.
+
+Chaque algorithme de run_optimization est exécuté sur une grille de tailles et
+de capacités, dans un processus séparé interrompu après `--timeout` secondes;
+le temps, le pic mémoire et l'écart à l'optimum (obtenu par un solveur exact
+ayant prouvé l'optimalité) sont écrits en CSV ou JSON pour comparer les
+versions entre elles.
+
+Avec `--startup`, mesure plutôt le démarrage à froid: durée d'import des
+modules et de la première résolution gloutonne dans des processus Python
+neufs (comme un processus de travail), et modules lourds alors chargés.
+
+Usage: python benchmark.py --sizes 100 1000 --capacity-ratios 0.1 0.5 -o bench.csv
+       python benchmark.py --startup --repeats 10
+"""
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from algorithms import ALGORITHMS
+from helpers import EXACT_ALGORITHMS, diagnostics_to_stderr, run_optimization
+
+# Algorithmes du registre exclus par défaut: le portefeuille et les îles lancent leurs propres
+# processus, interdits dans les processus (démons) du Pool de mesure; le balayage est la
+# programmation dynamique sans réduction, déjà mesurée par 'dynamic'
+EXCLUDED_ALGORITHMS = ('portfolio', 'genetic_islands', 'sweep')
+BENCHMARK_ALGORITHMS = [name for name in ALGORITHMS if name not in EXCLUDED_ALGORITHMS]
+# Démarrage à froid: instructions exécutées dans un processus neuf
+STARTUP_TARGETS = {
+    'import_helpers': "import helpers",
+    'first_greedy_solve': "from helpers import run_optimization\n"
+                          "run_optimization({'weight': [3, 4, 5], 'value': [4, 5, 6]}, 8, 'greedy')",
+    'import_app': "import app",
+}
+# Dépendances dont le chargement est signalé
+HEAVY_MODULES = ('pyomo', 'dash', 'plotly')
+
+
+def uncorrelated(rng, n, r):
+    """Poids et valeurs indépendants, uniformes sur [1, r]"""
+    return rng.integers(1, r + 1, n), rng.integers(1, r + 1, n)
+
+
+def weakly_correlated(rng, n, r):
+    """Valeurs à ±r/10 du poids"""
+    weights = rng.integers(1, r + 1, n)
+    values = weights + rng.integers(-(r // 10), r // 10 + 1, n)
+    return weights, np.maximum(values, 1)
+
+
+def strongly_correlated(rng, n, r):
+    """Valeur = poids + r/10"""
+    weights = rng.integers(1, r + 1, n)
+    return weights, weights + r // 10
+
+
+def inverse_strongly_correlated(rng, n, r):
+    """Poids = valeur + r/10"""
+    values = rng.integers(1, r + 1, n)
+    return values + r // 10, values
+
+
+def subset_sum(rng, n, r):
+    """Valeur = poids"""
+    weights = rng.integers(1, r + 1, n)
+    return weights, weights.copy()
+
+
+def spanner(rng, n, r, span_size=2, multiplier=10):
+    """Multiples d'un petit ensemble générateur fortement corrélé (spanner(2, 10))"""
+    base_weights, base_values = strongly_correlated(rng, span_size, r)
+    base_weights = np.ceil(2 * base_weights / multiplier).astype(np.int64)
+    base_values = np.ceil(2 * base_values / multiplier).astype(np.int64)
+    picks = rng.integers(0, span_size, n)
+    factors = rng.integers(1, multiplier + 1, n)
+    return base_weights[picks] * factors, base_values[picks] * factors
+
+
+GENERATORS = {
+    'uncorrelated': uncorrelated,
+    'weakly_correlated': weakly_correlated,
+    'strongly_correlated': strongly_correlated,
+    'inverse_strongly_correlated': inverse_strongly_correlated,
+    'subset_sum': subset_sum,
+    'spanner': spanner,
+}
+
+
+def make_items(weights, values):
+    """Objets au format de run_optimization"""
+    return [{'id': i + 1, 'name': f'Objet_{i+1}', 'weight': int(w), 'value': int(v), 'ratio': round(v / w, 2)}
+            for i, (w, v) in enumerate(zip(weights.tolist(), values.tolist()))]
+
+
+def measure_time(items, capacity, algorithm, params=None):
+    """Exécute un algorithme; retourne (résumé, durée en s)"""
+    start = time.perf_counter()
+    summary = run_optimization(items, capacity, algorithm, params=params)['summary']
+    return summary, time.perf_counter() - start
+
+
+def measure_memory(items, capacity, algorithm, params=None):
+    """Pic mémoire (Mo) d'une exécution, mesuré avec tracemalloc.
+
+    Exécution séparée de measure_time: tracemalloc ralentit fortement les
+    boucles Python et fausserait les durées.
+    """
+    tracemalloc.start()
+    try:
+        run_optimization(items, capacity, algorithm, params=params)
+        return tracemalloc.get_traced_memory()[1] / 2 ** 20
+    finally:
+        tracemalloc.stop()
+
+
+def _restart(pool):
+    """Remplace un processus de mesure bloqué"""
+    pool.terminate()
+    return multiprocessing.Pool(1, diagnostics_to_stderr)
+
+
+def run_benchmark(sizes, capacity_ratios, generators=None, algorithms=None,
+                  value_range=1000, seed=0, max_nodes=1_000_000, timeout=60):
+    """Exécute la grille complète et retourne une ligne par (instance, algorithme)"""
+    rows = []
+    # Les messages des moteurs vont sur la sortie d'erreur: le CSV peut être écrit sur la sortie standard
+    pool = multiprocessing.Pool(1, diagnostics_to_stderr)
+    try:
+        for generator in generators or list(GENERATORS):
+            for n in sizes:
+                rng = np.random.default_rng([seed, n])
+                weights, values = GENERATORS[generator](rng, n, value_range)
+                items = make_items(weights, values)
+                for ratio in capacity_ratios:
+                    capacity = max(int(ratio * weights.sum()), 1)
+                    instance_rows = []
+                    for algorithm in algorithms or BENCHMARK_ALGORITHMS:
+                        params = {'max_nodes': max_nodes} if algorithm == 'branch_bound' else None
+                        row = {'generator': generator, 'n': n, 'capacity': capacity, 'seed': seed,
+                               'algorithm': algorithm}
+                        args = (items, capacity, algorithm, params)
+                        try:
+                            summary, elapsed = pool.apply_async(measure_time, args).get(timeout)
+                        except multiprocessing.TimeoutError:
+                            # Un solveur natif ne s'interrompt pas: le processus est remplacé
+                            pool = _restart(pool)
+                            row.update(status='timeout', effective_algorithm=None, value=None, weight=None,
+                                       time_s=timeout, peak_memory_mb=None, proven_optimal=False)
+                        else:
+                            try:
+                                peak = round(pool.apply_async(measure_memory, args).get(timeout), 3)
+                            except multiprocessing.TimeoutError:
+                                pool = _restart(pool)
+                                peak = None
+                            proven = summary['algorithm'] in EXACT_ALGORITHMS and summary.get('optimal', True)
+                            row.update(status='ok',
+                                       effective_algorithm=summary['algorithm'],
+                                       value=float(summary['total_value']),
+                                       weight=float(summary['total_weight']),
+                                       time_s=round(elapsed, 6),
+                                       peak_memory_mb=peak,
+                                       proven_optimal=bool(proven))
+                        instance_rows.append(row)
+
+                    # Écart relatif à la meilleure valeur prouvée optimale (sinon à la meilleure connue)
+                    solved = [row for row in instance_rows if row['value'] is not None]
+                    proven_values = [row['value'] for row in solved if row['proven_optimal']]
+                    reference = max(proven_values or [row['value'] for row in solved] or [0.0])
+                    for row in instance_rows:
+                        row['reference_value'] = reference
+                        row['reference_optimal'] = bool(proven_values)
+                        row['gap'] = (round((reference - row['value']) / reference, 6)
+                                      if row['value'] is not None and reference else None)
+                    rows.extend(instance_rows)
+    finally:
+        pool.terminate()
+    return rows
+
+
+def measure_startup(statement, repeats=5):
+    """Exécute `statement` dans `repeats` processus Python neufs.
+
+    Retourne une ligne: durées médiane et minimale de l'instruction (imports
+    compris) et du processus entier (démarrage de l'interpréteur compris),
+    et modules lourds chargés à la fin.
+    """
+    code = ("import sys, time\nstart = time.perf_counter()\n" + statement + "\n"
+            "print(time.perf_counter() - start, *(name in sys.modules for name in " + repr(HEAVY_MODULES) + "))")
+    directory = os.path.dirname(os.path.abspath(__file__))
+    durations, process_durations = [], []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        output = subprocess.run([sys.executable, '-c', code], cwd=directory, capture_output=True, text=True,
+                                check=True)
+        process_durations.append(time.perf_counter() - start)
+        fields = output.stdout.split()[-1 - len(HEAVY_MODULES):]
+        durations.append(float(fields[0]))
+        loaded = [name for name, flag in zip(HEAVY_MODULES, fields[1:]) if flag == 'True']
+    return {'median_s': round(statistics.median(durations), 4), 'min_s': round(min(durations), 4),
+            'process_median_s': round(statistics.median(process_durations), 4),
+            'loaded_modules': ' '.join(loaded)}
+
+
+def run_startup(repeats=5):
+    """Démarrage à froid de chaque cible de STARTUP_TARGETS"""
+    return [dict(target=target, repeats=repeats, **measure_startup(statement, repeats))
+            for target, statement in STARTUP_TARGETS.items()]
+
+
+def write_rows(rows, output, output_format):
+    """Écrit les lignes en CSV ou JSON"""
+    target = sys.stdout if output == '-' else open(output, 'w', newline='', encoding='utf-8')
+    try:
+        if output_format == 'json':
+            json.dump(rows, target, indent=2)
+            target.write('\n')
+        elif rows:
+            writer = csv.DictWriter(target, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+    finally:
+        if target is not sys.stdout:
+            target.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Banc d'essai des algorithmes de sac à dos")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000], help="nombres d'objets")
+    parser.add_argument('--capacity-ratios', type=float, nargs='+', default=[0.1, 0.5],
+                        help="capacités en fraction du poids total")
+    parser.add_argument('--generators', nargs='+', choices=list(GENERATORS), default=None)
+    parser.add_argument('--algorithms', nargs='+', choices=BENCHMARK_ALGORITHMS, default=None)
+    parser.add_argument('--range', type=int, default=1000, dest='value_range', help="borne R des poids/valeurs")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--max-nodes', type=int, default=1_000_000, help="limite de nœuds de la séparation et évaluation")
+    parser.add_argument('--timeout', type=float, default=60, help="durée maximale d'une exécution (s)")
+    parser.add_argument('--startup', action='store_true',
+                        help="mesure le démarrage à froid (imports, première résolution) au lieu des algorithmes")
+    parser.add_argument('--repeats', type=int, default=5, help="processus lancés par mesure de démarrage")
+    parser.add_argument('-f', '--format', choices=['csv', 'json'], default='csv')
+    parser.add_argument('-o', '--output', default='-')
+    args = parser.parse_args(argv)
+
+    if args.startup:
+        write_rows(run_startup(args.repeats), args.output, args.format)
+        return
+    rows = run_benchmark(args.sizes, args.capacity_ratios, args.generators, args.algorithms,
+                         args.value_range, args.seed, args.max_nodes, args.timeout)
+    write_rows(rows, args.output, args.format)
+
+
+if __name__ == '__main__':
+    main()
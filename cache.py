@@ -0,0 +1,128 @@
+"""Cache des solutions adressé par contenu: LRU en mémoire et base sqlite sur disque"""
+from collections import OrderedDict
+from contextlib import contextmanager
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+
+def solution_key(weights, values, max_capacity, algorithm, params=None):
+    """Empreinte stable d'une instance et de la configuration de l'algorithme"""
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(np.ascontiguousarray(weights, dtype=np.float64).tobytes())
+    digest.update(np.ascontiguousarray(values, dtype=np.float64).tobytes())
+    digest.update(json.dumps([float(max_capacity), algorithm, params or {}],
+                             sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+
+class SolutionCache:
+    """Cache à deux niveaux des résultats de résolution.
+
+    Le niveau mémoire est un LRU borné à `max_entries` (0 le désactive, pour
+    les processus qui ne font qu'une résolution); le niveau disque
+    optionnel (`path`) est une base sqlite en mode WAL, qui survit aux
+    redémarrages et peut être partagée entre plusieurs processus. Il est
+    borné à `disk_max_entries` entrées: chaque écriture supprime les moins
+    récemment utilisées au-delà. Succès, échecs et évictions sont comptés
+    dans `metrics` (metrics.Metrics) s'il est fourni.
+    """
+
+    def __init__(self, max_entries=128, path=None, disk_max_entries=10000, metrics=None):
+        self.max_entries = max_entries
+        self.path = path
+        self.disk_max_entries = disk_max_entries
+        self.metrics = metrics
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        if path:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            with self._connect() as connection:
+                connection.execute('PRAGMA journal_mode=WAL')
+                connection.execute(
+                    'CREATE TABLE IF NOT EXISTS solutions '
+                    '(key TEXT PRIMARY KEY, payload TEXT NOT NULL, created REAL NOT NULL, used REAL NOT NULL)'
+                )
+                columns = {row[1] for row in connection.execute('PRAGMA table_info(solutions)')}
+                if 'used' not in columns:
+                    # Base créée par une version sans éviction
+                    connection.execute('ALTER TABLE solutions ADD COLUMN used REAL NOT NULL DEFAULT 0')
+                connection.execute('CREATE INDEX IF NOT EXISTS solutions_used ON solutions (used)')
+
+    def _count(self, event, amount=1):
+        if self.metrics is not None and amount:
+            self.metrics.inc('knapsack_solution_cache_total', {'event': event}, amount)
+
+    @contextmanager
+    def _connect(self):
+        connection = sqlite3.connect(self.path, timeout=10)
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    def get(self, key):
+        """Retourne l'entrée associée à `key`, ou None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+        if entry is not None:
+            self._count('hit')
+            return entry
+
+        if self.path:
+            with self._connect() as connection:
+                row = connection.execute(
+                    'SELECT payload FROM solutions WHERE key = ?', (key,)
+                ).fetchone()
+                if row is not None:
+                    connection.execute('UPDATE solutions SET used = ? WHERE key = ?', (time.time(), key))
+            if row is not None:
+                entry = json.loads(row[0])
+                self._count('disk_hit')
+                self._remember(key, entry)
+                return entry
+
+        self._count('miss')
+        return None
+
+    def put(self, key, entry):
+        """Enregistre une entrée sérialisable en JSON dans les deux niveaux"""
+        self._remember(key, entry)
+        if self.path:
+            now = time.time()
+            with self._connect() as connection:
+                connection.execute(
+                    'INSERT OR REPLACE INTO solutions (key, payload, created, used) VALUES (?, ?, ?, ?)',
+                    (key, json.dumps(entry), now, now)
+                )
+                evicted = connection.execute(
+                    'DELETE FROM solutions WHERE key IN '
+                    '(SELECT key FROM solutions ORDER BY used DESC LIMIT -1 OFFSET ?)',
+                    (self.disk_max_entries,)
+                ).rowcount
+            self._count('disk_eviction', evicted)
+
+    def _remember(self, key, entry):
+        if self.max_entries <= 0:
+            return
+        evicted = 0
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                evicted += 1
+        self._count('eviction', evicted)
+
+    def clear(self):
+        """Vide le niveau mémoire (le niveau disque est conservé)"""
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,39 @@
+import os
+
+OUTPUT_DIR = 'outputs'
+
+# Cache des solutions (cache.SolutionCache)
+CACHE_PATH = os.environ.get('KNAPSACK_CACHE_PATH', os.path.join(OUTPUT_DIR, 'solution_cache.sqlite'))
+CACHE_DISK_MAX_ENTRIES = int(os.environ.get('KNAPSACK_CACHE_DISK_MAX_ENTRIES', 10000))
+
+# Jeux d'objets conservés côté serveur (datasets.DatasetRegistry), expirés après DATASET_TTL secondes d'inactivité
+DATASETS_DIR = os.environ.get('KNAPSACK_DATASETS_DIR', os.path.join(OUTPUT_DIR, 'datasets'))
+DATASET_TTL = int(os.environ.get('KNAPSACK_DATASET_TTL', 3600))
+
+# Lignes par page des tableaux d'objets (pagination, tri et filtre côté serveur)
+TABLE_PAGE_SIZE = int(os.environ.get('KNAPSACK_TABLE_PAGE_SIZE', 15))
+
+# Graphiques: rendu WebGL au-delà de CHART_WEBGL_POINTS objets; au-delà de CHART_MAX_POINTS, densité des objets
+# en CHART_BINS x CHART_BINS cases et échantillon des objets sélectionnés (taille des figures bornée)
+CHART_WEBGL_POINTS = int(os.environ.get('KNAPSACK_CHART_WEBGL_POINTS', 1000))
+CHART_MAX_POINTS = int(os.environ.get('KNAPSACK_CHART_MAX_POINTS', 5000))
+CHART_BINS = int(os.environ.get('KNAPSACK_CHART_BINS', 100))
+
+# Exports à la demande (export.py): un fichier par résultat et par format, réutilisé ensuite, supprimé
+# après EXPORT_TTL secondes sans téléchargement (par défaut, comme les jeux d'objets)
+EXPORT_DIR = os.environ.get('KNAPSACK_EXPORT_DIR', os.path.join(OUTPUT_DIR, 'exports'))
+EXPORT_TTL = int(os.environ.get('KNAPSACK_EXPORT_TTL', DATASET_TTL))
+EXPORT_FORMAT = os.environ.get('KNAPSACK_EXPORT_FORMAT', 'jsonl.gz')
+
+# Résolutions en tâche de fond (jobs.py)
+JOBS_CACHE_DIR = os.environ.get('KNAPSACK_JOBS_CACHE_DIR', os.path.join(OUTPUT_DIR, 'jobs'))
+MAX_CONCURRENT_SOLVES = int(os.environ.get('KNAPSACK_MAX_CONCURRENT_SOLVES', 2))
+PROGRESS_INTERVAL = float(os.environ.get('KNAPSACK_PROGRESS_INTERVAL', 0.25))
+# Part des réponses de résolution ré-encodées en JSON pour mesurer leur sérialisation (/metrics)
+SERIALIZE_SAMPLE_RATE = float(os.environ.get('KNAPSACK_SERIALIZE_SAMPLE_RATE', 0.05))
+
+# Précision par défaut du schéma d'approximation (FPTAS): solution d'au moins (1 - epsilon) fois l'optimum
+FPTAS_EPSILON = float(os.environ.get('KNAPSACK_FPTAS_EPSILON', 0.1))
+
+# Moteurs lancés en parallèle (un processus chacun) par le mode portefeuille, en plus du glouton
+PORTFOLIO_ENGINES = os.environ.get('KNAPSACK_PORTFOLIO_ENGINES', 'genetic,dynamic,exact,branch_bound').split(',')
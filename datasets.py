@@ -0,0 +1,275 @@
+"""Registre côté serveur des jeux d'objets et des solutions, stockés en colonnes"""
+from collections import OrderedDict
+import math
+import re
+import threading
+import uuid
+
+import diskcache
+import numpy as np
+import pandas as pd
+
+ITEM_COLUMNS = ('id', 'name', 'weight', 'value', 'ratio')
+# Colonnes modifiables depuis le tableau des objets
+EDITABLE_COLUMNS = ('weight', 'value')
+
+# Terme d'un filter_query de DataTable: {colonne} opérateur valeur
+_FILTER_TERM = re.compile(
+    r'\{(?P<column>[^}]+)\}\s+(?P<case>[si]?)(?P<operator>>=|<=|!=|=|>|<|eq|ne|ge|le|gt|lt|contains|datestartswith)'
+    r'\s+(?P<value>.+)'
+)
+_COMPARISONS = {
+    '=': np.equal, 'eq': np.equal, '!=': np.not_equal, 'ne': np.not_equal,
+    '>': np.greater, 'gt': np.greater, '>=': np.greater_equal, 'ge': np.greater_equal,
+    '<': np.less, 'lt': np.less, '<=': np.less_equal, 'le': np.less_equal,
+}
+
+
+def item_names(ids):
+    """Noms des objets, dérivés de leurs id"""
+    return np.array([f'Objet_{i}' for i in np.asarray(ids).tolist()], dtype=object)
+
+
+def _column(columns, name, positions):
+    """Colonne restreinte à `positions`; les noms non stockés sont dérivés des id"""
+    if name == 'name' and 'name' not in columns:
+        return item_names(columns['id'][positions])
+    return columns[name][positions]
+
+
+class DatasetExpired(KeyError):
+    """Le jeu de données demandé n'existe pas ou a expiré"""
+
+
+class DatasetRegistry:
+    """Tableaux NumPy identifiés par un id, avec expiration après `ttl` secondes.
+
+    Les jeux sont rangés dans un cache disque partagé par le serveur et les
+    processus des callbacks en arrière-plan; seul leur id (et un résumé)
+    transite par les dcc.Store du navigateur. Chaque accès repousse
+    l'expiration. Un jeu enregistré n'est jamais modifié: les
+    `local_entries` derniers lus sont gardés en mémoire dans chaque processus.
+    """
+
+    def __init__(self, directory, ttl=3600, local_entries=4):
+        self.cache = diskcache.Cache(directory)
+        self.ttl = ttl
+        self.local_entries = local_entries
+        self._local = OrderedDict()
+        self._views = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, columns):
+        """Enregistre un dict de colonnes; retourne l'id du jeu"""
+        columns = {name: np.asarray(values) for name, values in columns.items()}
+        dataset_id = uuid.uuid4().hex
+        self.cache.set(dataset_id, columns, expire=self.ttl)
+        self._remember(dataset_id, columns)
+        return dataset_id
+
+    def get(self, dataset_id):
+        """Colonnes du jeu `dataset_id`; lève DatasetExpired s'il n'existe plus"""
+        if not dataset_id:
+            raise DatasetExpired(dataset_id)
+        if not self.cache.touch(dataset_id, expire=self.ttl):
+            with self._lock:
+                self._local.pop(dataset_id, None)
+            raise DatasetExpired(dataset_id)
+        with self._lock:
+            if dataset_id in self._local:
+                self._local.move_to_end(dataset_id)
+                return self._local[dataset_id]
+        columns = self.cache.get(dataset_id)
+        if columns is None:
+            raise DatasetExpired(dataset_id)
+        self._remember(dataset_id, columns)
+        return columns
+
+    def derived(self, dataset_id, name, build):
+        """Valeur `name` dérivée du jeu `dataset_id` (graphiques...), construite par `build` au premier appel.
+
+        Elle est rangée dans le cache disque avec la même expiration que les
+        jeux, si bien que tous les processus servent le même résultat.
+        """
+        key = ('derived', dataset_id, name)
+        value = self.cache.get(key)
+        if value is None:
+            value = build()
+            self.cache.set(key, value, expire=self.ttl)
+        return value
+
+    def _remember(self, dataset_id, columns):
+        with self._lock:
+            self._local[dataset_id] = columns
+            self._local.move_to_end(dataset_id)
+            while len(self._local) > self.local_entries:
+                self._local.popitem(last=False)
+
+    def put_items(self, items):
+        """Enregistre des objets (DataFrame ou dict de colonnes, `name` facultatif).
+
+        Retourne le résumé à placer dans un dcc.Store.
+        """
+        dataset_id = self.put({name: np.asarray(items[name]) for name in ITEM_COLUMNS if name in items})
+        return dict(items_summary(items), dataset_id=dataset_id)
+
+    def get_items(self, dataset_id, names=True):
+        """DataFrame des objets du jeu `dataset_id`; sans `names`, les noms ne sont pas dérivés"""
+        columns = self.get(dataset_id)
+        df = pd.DataFrame(columns, copy=False)
+        if names and 'name' not in columns:
+            df.insert(1, 'name', item_names(columns['id']))
+        return df
+
+    def edit_items(self, dataset, changes):
+        """Enregistre une nouvelle version d'un jeu d'objets modifié.
+
+        `dataset` est le résumé retourné par put_items, `changes` un dict
+        {id d'objet: {colonne: valeur}} (voir row_changes). Le jeu d'origine
+        n'est pas modifié; le résumé retourné garde la trace de sa racine
+        (`root_id`), ce qui permet de ré-optimiser à partir d'une solution
+        calculée sur une version précédente.
+        """
+        columns = dict(self.get(dataset['dataset_id']))
+        positions = pd.Index(columns['id']).get_indexer(list(changes))
+        found = positions >= 0
+        positions = positions[found]
+        changes = [change for change, ok in zip(changes.values(), found) if ok]
+        if not len(positions):
+            return None
+
+        for name in EDITABLE_COLUMNS:
+            updates = [(position, change[name]) for position, change in zip(positions, changes) if name in change]
+            if not updates:
+                continue
+            rows, values = map(np.array, zip(*updates))
+            column = columns[name]
+            if not np.all(np.mod(values, 1) == 0):
+                column = column.astype(float)
+            columns[name] = column = column.copy()
+            column[rows] = values
+        columns['ratio'] = columns['ratio'].copy()
+        columns['ratio'][positions] = np.round(columns['value'][positions] / columns['weight'][positions], 2)
+
+        summary = self.put_items(columns)
+        return dict(dataset, **summary, parent_id=dataset['dataset_id'],
+                    root_id=dataset.get('root_id', dataset['dataset_id']), edits=dataset.get('edits', 0) + 1)
+
+    def view(self, dataset_id, selection_id=None, sort_by=None, filter_query=''):
+        """Positions des objets filtrés puis triés, limitées à une sélection.
+
+        Le résultat est gardé en mémoire pour les `local_entries` dernières
+        combinaisons, si bien que changer de page ne coûte qu'une tranche.
+        """
+        columns = self.get(dataset_id)
+        key = (dataset_id, selection_id, tuple((s['column_id'], s['direction']) for s in sort_by or []),
+               filter_query or '')
+        with self._lock:
+            if key in self._views:
+                self._views.move_to_end(key)
+                return columns, self._views[key]
+
+        if selection_id:
+            positions = np.asarray(self.get(selection_id)['chosen'], dtype=np.intp)
+        else:
+            positions = np.arange(len(columns[ITEM_COLUMNS[0]]), dtype=np.intp)
+        if filter_query:
+            positions = positions[filter_mask(columns, positions, filter_query)]
+        # Tri stable par clés successives, de la moins à la plus prioritaire
+        for sort in reversed(sort_by or []):
+            keys = _column(columns, sort['column_id'], positions)
+            if sort['direction'] == 'desc':
+                # Clé opposée (rang pour les chaînes): les ex aequo gardent leur ordre
+                if keys.dtype.kind not in 'if':
+                    keys = np.unique(keys, return_inverse=True)[1]
+                keys = -keys
+            positions = positions[np.argsort(keys, kind='stable')]
+
+        with self._lock:
+            self._views[key] = positions
+            while len(self._views) > self.local_entries:
+                self._views.popitem(last=False)
+        return columns, positions
+
+    def page(self, dataset_id, page_current, page_size, selection_id=None, sort_by=None, filter_query=''):
+        """Lignes d'une page d'un DataTable en pagination serveur; retourne (lignes, nombre de pages)"""
+        columns, positions = self.view(dataset_id, selection_id, sort_by, filter_query)
+        rows = positions[page_current * page_size:(page_current + 1) * page_size]
+        page = pd.DataFrame({name: _column(columns, name, rows) for name in ITEM_COLUMNS})
+        return page.to_dict('records'), max(math.ceil(len(positions) / page_size), 1)
+
+
+def row_changes(rows, previous_rows):
+    """Modifications valides entre deux états d'une page de DataTable: {id: {colonne: valeur}}.
+
+    Seuls les poids (strictement positifs) et les valeurs (positives ou
+    nulles) numériques sont retenus.
+    """
+    changes = {}
+    for row, previous in zip(rows, previous_rows):
+        if row.get('id') != previous.get('id'):
+            continue
+        for name in EDITABLE_COLUMNS:
+            if row.get(name) == previous.get(name):
+                continue
+            try:
+                value = float(row[name])
+            except (TypeError, ValueError):
+                continue
+            if np.isfinite(value) and (value > 0 or (name == 'value' and value == 0)):
+                changes.setdefault(row['id'], {})[name] = value
+    return changes
+
+
+def _parse_value(text):
+    """Valeur d'un terme de filtre: nombre ou chaîne (guillemets retirés)"""
+    text = text.strip()
+    if len(text) >= 2 and text[0] == text[-1] and text[0] in '"\'`':
+        return text[1:-1]
+    try:
+        return float(text)
+    except ValueError:
+        return text
+
+
+def filter_mask(columns, positions, filter_query):
+    """Masque des positions satisfaisant un filter_query de DataTable (termes reliés par &&)"""
+    mask = np.ones(len(positions), dtype=bool)
+    for term in filter_query.split(' && '):
+        match = _FILTER_TERM.fullmatch(term.strip())
+        if match is None or match['column'] not in ITEM_COLUMNS:
+            continue
+        values = _column(columns, match['column'], positions)
+        target = _parse_value(match['value'])
+        operator = match['operator']
+        if values.dtype.kind in 'iuf' and isinstance(target, float) and operator in _COMPARISONS:
+            mask &= _COMPARISONS[operator](values, target)
+            continue
+
+        # Colonnes textuelles (ou valeur non numérique): comparaison de chaînes
+        strings = pd.Series(values).astype(str)
+        if isinstance(target, float):
+            target = str(int(target)) if target.is_integer() else str(target)
+        case = match['case'] != 'i'
+        if operator == 'contains':
+            mask &= strings.str.contains(target, case=case, regex=False).to_numpy()
+        elif operator == 'datestartswith':
+            mask &= strings.str.startswith(target).to_numpy()
+        elif operator in _COMPARISONS:
+            if not case:
+                strings, target = strings.str.lower(), target.lower()
+            mask &= _COMPARISONS[operator](strings.to_numpy(dtype=object), target).astype(bool)
+    return mask
+
+
+def items_summary(items):
+    """Statistiques d'un jeu d'objets, assez petites pour transiter par le navigateur"""
+    weights = np.asarray(items['weight'], dtype=float)
+    values = np.asarray(items['value'], dtype=float)
+    ratios = np.divide(values, weights, out=np.full(len(weights), np.nan), where=weights > 0)
+    return {
+        'num_items': len(weights),
+        'total_weight': float(weights.sum()),
+        'total_value': float(values.sum()),
+        'mean_ratio': float(np.nanmean(ratios)) if len(weights) else 0.0,
+    }
@@ -0,0 +1,160 @@
+"""Export à la demande des résultats, directement depuis les tableaux stockés.
+
+Un export est écrit une seule fois par résultat et par format (fichier nommé
+d'après l'id du résultat), puis servi tel quel: un second téléchargement
+relit les mêmes octets. Les exports inutilisés depuis plus de `ttl` secondes
+sont supprimés lors de l'écriture d'un nouvel export. Les objets sont écrits par blocs de EXPORT_CHUNK
+lignes, si bien que la mémoire utilisée ne dépend pas du nombre d'objets.
+
+Formats: JSON Lines (une ligne de configuration et de résumé, puis une ligne
+par objet avec sa décision `selected`), éventuellement compressé (gzip, ou
+zstd si `zstandard` est installé), et fichiers en colonnes Parquet ou Arrow
+si `pyarrow` est installé (résumé dans les métadonnées du schéma).
+"""
+import gzip
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from datasets import ITEM_COLUMNS, item_names
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Objets écrits par bloc
+EXPORT_CHUNK = 65536
+# Format -> (extension, libellé)
+FORMATS = {
+    'jsonl': ('.jsonl', 'JSON Lines'),
+    'jsonl.gz': ('.jsonl.gz', 'JSON Lines (gzip)'),
+    'jsonl.zst': ('.jsonl.zst', 'JSON Lines (zstd)'),
+    'parquet': ('.parquet', 'Parquet'),
+    'arrow': ('.arrow', 'Arrow IPC'),
+}
+
+
+def available_formats():
+    """Formats utilisables avec les bibliothèques installées"""
+    missing = set()
+    if zstandard is None:
+        missing.add('jsonl.zst')
+    if pa is None:
+        missing.update(('parquet', 'arrow'))
+    return [name for name in FORMATS if name not in missing]
+
+
+def _chunks(columns, chosen):
+    """Blocs successifs des objets (DataFrame), avec la colonne `selected`"""
+    num_items = len(columns['id'])
+    selected = np.zeros(num_items, dtype=bool)
+    selected[np.asarray(chosen, dtype=np.intp)] = True
+    for start in range(0, num_items, EXPORT_CHUNK):
+        rows = slice(start, start + EXPORT_CHUNK)
+        chunk = {name: columns[name][rows] for name in ITEM_COLUMNS if name in columns}
+        if 'name' not in chunk:
+            chunk['name'] = item_names(chunk['id'])
+        chunk = pd.DataFrame({name: chunk[name] for name in ITEM_COLUMNS}, copy=False)
+        chunk['selected'] = selected[rows]
+        yield chunk
+
+
+def _json_default(value):
+    """Convertit les scalaires NumPy présents dans les résumés"""
+    return value.item()
+
+
+def _write_jsonl(stream, header, columns, chosen):
+    stream.write((json.dumps(header, ensure_ascii=False, default=_json_default) + '\n').encode())
+    for chunk in _chunks(columns, chosen):
+        lines = chunk.to_json(orient='records', lines=True, force_ascii=False)
+        stream.write((lines if lines.endswith('\n') else lines + '\n').encode())
+
+
+def _write_columnar(path, fmt, header, columns, chosen):
+    writer = None
+    try:
+        for chunk in _chunks(columns, chosen):
+            batch = pa.RecordBatch.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                schema = batch.schema.with_metadata({'knapsack': json.dumps(header, default=_json_default)})
+                writer = pq.ParquetWriter(path, schema) if fmt == 'parquet' else pa.ipc.new_file(path, schema)
+            writer.write_batch(batch.replace_schema_metadata(schema.metadata))
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def remove_expired(directory, ttl):
+    """Supprime les fichiers de `directory` inutilisés depuis plus de `ttl` secondes"""
+    limit = time.time() - ttl
+    try:
+        entries = list(os.scandir(directory))
+    except FileNotFoundError:
+        return
+    for entry in entries:
+        try:
+            if entry.is_file() and entry.stat().st_mtime < limit:
+                os.remove(entry.path)
+        except FileNotFoundError:
+            pass
+
+
+def export_results(directory, result_id, columns, chosen, header, fmt='jsonl.gz', ttl=None):
+    """Chemin de l'export `fmt` du résultat `result_id`, écrit au premier appel.
+
+    `columns` sont les colonnes stockées du jeu d'objets, `chosen` les
+    positions sélectionnées et `header` (configuration et résumé) est placé en
+    tête du JSON Lines ou dans les métadonnées Parquet/Arrow. Le fichier est
+    écrit sous un nom temporaire puis renommé: des exports simultanés du même
+    résultat ne produisent jamais de fichier partiel. Chaque appel repousse
+    l'expiration de l'export; avec `ttl`, les exports expirés (voir
+    remove_expired) sont supprimés avant d'en écrire un nouveau.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"format inconnu: {fmt} (attendu: {', '.join(FORMATS)})")
+    if fmt not in available_formats():
+        raise ValueError(f"format {fmt} indisponible: installez {'zstandard' if fmt == 'jsonl.zst' else 'pyarrow'}")
+    path = os.path.join(directory, f"knapsack_results_{result_id}{FORMATS[fmt][0]}")
+    try:
+        os.utime(path)
+        return path
+    except FileNotFoundError:
+        pass
+
+    if ttl is not None:
+        remove_expired(directory, ttl)
+    os.makedirs(directory, exist_ok=True)
+    descriptor, temporary = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        if fmt in ('parquet', 'arrow'):
+            os.close(descriptor)
+            _write_columnar(temporary, fmt, header, columns, chosen)
+        else:
+            with open(descriptor, 'wb') as raw:
+                if fmt == 'jsonl.gz':
+                    # Niveau 6: l'essentiel du gain de gzip pour une fraction du temps du niveau 9
+                    with gzip.GzipFile(fileobj=raw, mode='wb', compresslevel=6, mtime=0) as stream:
+                        _write_jsonl(stream, header, columns, chosen)
+                elif fmt == 'jsonl.zst':
+                    with zstandard.ZstdCompressor(level=3).stream_writer(raw, closefd=False) as stream:
+                        _write_jsonl(stream, header, columns, chosen)
+                else:
+                    _write_jsonl(raw, header, columns, chosen)
+        os.replace(temporary, path)
+    except BaseException:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+        raise
+    return path
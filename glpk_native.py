@@ -0,0 +1,334 @@
+"""Backend GLPK en mémoire via ctypes (sans sous-processus ni fichiers LP)"""
+import ctypes
+import ctypes.util
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+GLPK_DIR = 'setup/winglpk-4.65/glpk-4.65'
+# Bibliothèque partagée produite par build_library() à partir des sources embarquées
+BUILD_PATH = os.path.join(GLPK_DIR, 'lib', 'libglpk.so')
+DLL_PATH = os.path.join(GLPK_DIR, 'w64', 'glpk_4_65.dll')
+
+# Constantes de glpk.h
+GLP_MAX = 2
+GLP_UP = 3
+GLP_BV = 3
+GLP_ON = 1
+GLP_OFF = 0
+GLP_MSG_OFF = 0
+GLP_DUALP = 2
+GLP_RT_FLIP = 0x33
+GLP_FEAS = 2
+GLP_OPT = 5
+GLP_ETMLIM = 0x09
+GLP_IBINGO = 0x02
+GLP_IHEUR = 0x03
+
+# Ajouté à la bibliothèque compilée par build_library(): colonnes binaires et objectif en un seul appel
+_COLUMNS_SOURCE = r'''#include "glpk.h"
+
+void glpk_set_binary_columns(glp_prob *P, int n, const double obj[])
+{     int j;
+      for (j = 1; j <= n; j++)
+      {  glp_set_col_kind(P, j, GLP_BV);
+         glp_set_obj_coef(P, j, obj[j]);
+      }
+      return;
+}
+'''
+
+# Rappel C du solveur MIP: void cb_func(glp_tree *T, void *info)
+_CALLBACK = ctypes.CFUNCTYPE(None, ctypes.c_void_p, ctypes.c_void_p)
+
+_library = None
+
+
+class _Smcp(ctypes.Structure):
+    """Paramètres du simplexe (struct glp_smcp de glpk.h 4.65)"""
+    _fields_ = [
+        ('msg_lev', ctypes.c_int),
+        ('meth', ctypes.c_int),
+        ('pricing', ctypes.c_int),
+        ('r_test', ctypes.c_int),
+        ('tol_bnd', ctypes.c_double),
+        ('tol_dj', ctypes.c_double),
+        ('tol_piv', ctypes.c_double),
+        ('obj_ll', ctypes.c_double),
+        ('obj_ul', ctypes.c_double),
+        ('it_lim', ctypes.c_int),
+        ('tm_lim', ctypes.c_int),
+        ('out_frq', ctypes.c_int),
+        ('out_dly', ctypes.c_int),
+        ('presolve', ctypes.c_int),
+        ('excl', ctypes.c_int),
+        ('shift', ctypes.c_int),
+        ('aorn', ctypes.c_int),
+        ('foo_bar', ctypes.c_double * 33),
+    ]
+
+
+class _Iocp(ctypes.Structure):
+    """Paramètres du solveur MIP (struct glp_iocp de glpk.h 4.65)"""
+    _fields_ = [
+        ('msg_lev', ctypes.c_int),
+        ('br_tech', ctypes.c_int),
+        ('bt_tech', ctypes.c_int),
+        ('tol_int', ctypes.c_double),
+        ('tol_obj', ctypes.c_double),
+        ('tm_lim', ctypes.c_int),
+        ('out_frq', ctypes.c_int),
+        ('out_dly', ctypes.c_int),
+        ('cb_func', ctypes.c_void_p),
+        ('cb_info', ctypes.c_void_p),
+        ('cb_size', ctypes.c_int),
+        ('pp_tech', ctypes.c_int),
+        ('mip_gap', ctypes.c_double),
+        ('mir_cuts', ctypes.c_int),
+        ('gmi_cuts', ctypes.c_int),
+        ('cov_cuts', ctypes.c_int),
+        ('clq_cuts', ctypes.c_int),
+        ('presolve', ctypes.c_int),
+        ('binarize', ctypes.c_int),
+        ('fp_heur', ctypes.c_int),
+        ('ps_heur', ctypes.c_int),
+        ('ps_tm_lim', ctypes.c_int),
+        ('sr_heur', ctypes.c_int),
+        ('use_sol', ctypes.c_int),
+        ('save_sol', ctypes.c_char_p),
+        ('alien', ctypes.c_int),
+        ('flip', ctypes.c_int),
+        ('foo_bar', ctypes.c_double * 23),
+    ]
+
+
+def _candidate_paths():
+    """Chemins possibles de la bibliothèque GLPK, du plus au moins prioritaire"""
+    paths = [os.environ.get('GLPK_LIBRARY'), BUILD_PATH]
+    if sys.platform == 'win32':
+        paths.append(DLL_PATH)
+    paths.append(ctypes.util.find_library('glpk'))
+    return [path for path in paths if path]
+
+
+def _declare(lib):
+    """Déclare les signatures C utilisées"""
+    prob, integer, double = ctypes.c_void_p, ctypes.c_int, ctypes.c_double
+    int_array = ctypes.POINTER(ctypes.c_int)
+    double_array = ctypes.POINTER(ctypes.c_double)
+    signatures = {
+        'glp_create_prob': (prob, []),
+        'glp_delete_prob': (None, [prob]),
+        'glp_set_obj_dir': (None, [prob, integer]),
+        'glp_add_rows': (integer, [prob, integer]),
+        'glp_add_cols': (integer, [prob, integer]),
+        'glp_set_row_bnds': (None, [prob, integer, integer, double, double]),
+        'glp_set_col_kind': (None, [prob, integer, integer]),
+        'glp_set_obj_coef': (None, [prob, integer, double]),
+        'glp_load_matrix': (None, [prob, integer, int_array, int_array, double_array]),
+        'glp_init_smcp': (None, [ctypes.POINTER(_Smcp)]),
+        'glp_simplex': (integer, [prob, ctypes.POINTER(_Smcp)]),
+        'glp_init_iocp': (None, [ctypes.POINTER(_Iocp)]),
+        'glp_intopt': (integer, [prob, ctypes.POINTER(_Iocp)]),
+        'glp_mip_status': (integer, [prob]),
+        'glp_mip_col_val': (double, [prob, integer]),
+        'glp_ios_reason': (integer, [ctypes.c_void_p]),
+        'glp_ios_heur_sol': (integer, [ctypes.c_void_p, double_array]),
+        'glp_ios_get_prob': (prob, [ctypes.c_void_p]),
+        'glp_ios_best_node': (integer, [ctypes.c_void_p]),
+        'glp_ios_node_bound': (double, [ctypes.c_void_p, integer]),
+        'glp_mip_obj_val': (double, [prob]),
+        'glp_term_out': (integer, [integer]),
+        'glp_version': (ctypes.c_char_p, []),
+    }
+    for name, (restype, argtypes) in signatures.items():
+        function = getattr(lib, name)
+        function.restype = restype
+        function.argtypes = argtypes
+    # Absente des bibliothèques GLPK non compilées par build_library()
+    if hasattr(lib, 'glpk_set_binary_columns'):
+        lib.glpk_set_binary_columns.restype = None
+        lib.glpk_set_binary_columns.argtypes = [prob, integer, double_array]
+    return lib
+
+
+def load_library():
+    """Charge la bibliothèque GLPK une seule fois; None si elle est introuvable"""
+    global _library
+    if _library is None:
+        for path in _candidate_paths():
+            try:
+                _library = _declare(ctypes.CDLL(path))
+                _library.glp_term_out(GLP_OFF)
+                break
+            except (OSError, AttributeError):
+                continue
+        else:
+            _library = False
+    return _library or None
+
+
+def is_available():
+    """Indique si le backend en mémoire est utilisable"""
+    return load_library() is not None
+
+
+def _as_array(values, ctype, dtype):
+    """Tableau NumPy contigu indexé à partir de 1, comme l'attend GLPK"""
+    array = np.zeros(len(values) + 1, dtype=dtype)
+    array[1:] = values
+    return array, array.ctypes.data_as(ctypes.POINTER(ctype))
+
+
+def solve_knapsack(weights, values, capacity, time_limit=None, incumbent=None, timings=None,
+                   progress=None):
+    """Résout le sac à dos 0/1 avec glp_intopt; retourne (indices choisis, optimal, borne).
+
+    `incumbent` (indices d'une solution réalisable) est proposé au solveur comme
+    solution heuristique dès la racine; `timings` reçoit les durées de
+    construction et de résolution; `progress` est appelé à chaque nouvelle
+    solution entière avec sa valeur et la meilleure borne de l'arbre. Après
+    `time_limit` secondes, la meilleure solution entière est retournée (à
+    défaut `incumbent`) avec la dernière borne supérieure connue de l'arbre
+    (None si aucune).
+
+    Le présolveur MIP est désactivé: `incumbent` et la progression portent
+    ainsi sur les colonnes d'origine. La relaxation continue est résolue au
+    préalable par le simplexe dual avec test de rapport à sauts de bornes,
+    qui traite les n colonnes bornées de la contrainte unique en quelques
+    itérations.
+    """
+    lib = load_library()
+    if lib is None:
+        raise OSError("Bibliothèque GLPK introuvable")
+
+    start = time.perf_counter()
+    n = len(weights)
+    problem = lib.glp_create_prob()
+    try:
+        lib.glp_set_obj_dir(problem, GLP_MAX)
+        lib.glp_add_rows(problem, 1)
+        lib.glp_set_row_bnds(problem, 1, GLP_UP, 0.0, float(capacity))
+        if n:
+            lib.glp_add_cols(problem, n)
+            obj, obj_ptr = _as_array(values, ctypes.c_double, np.float64)
+            if hasattr(lib, 'glpk_set_binary_columns'):
+                lib.glpk_set_binary_columns(problem, n, obj_ptr)
+            else:
+                set_kind, set_coef = lib.glp_set_col_kind, lib.glp_set_obj_coef
+                for j, value in enumerate(obj[1:].tolist(), start=1):
+                    set_kind(problem, j, GLP_BV)
+                    set_coef(problem, j, value)
+
+            # Contrainte de capacité chargée en un seul appel (format triplet)
+            ia, ia_ptr = _as_array(np.ones(n), ctypes.c_int, np.intc)
+            ja, ja_ptr = _as_array(np.arange(1, n + 1), ctypes.c_int, np.intc)
+            ar, ar_ptr = _as_array(weights, ctypes.c_double, np.float64)
+            lib.glp_load_matrix(problem, n, ia_ptr, ja_ptr, ar_ptr)
+
+        parm = _Iocp()
+        lib.glp_init_iocp(ctypes.byref(parm))
+        parm.msg_lev = GLP_MSG_OFF
+        parm.presolve = GLP_OFF
+
+        start_ptr = None
+        if incumbent is not None and len(incumbent):
+            start_values = np.zeros(n)
+            start_values[incumbent] = 1
+            start_array, start_ptr = _as_array(start_values, ctypes.c_double, np.float64)
+
+        proposed = False
+        bound = None
+
+        def on_event(tree, info):
+            nonlocal proposed, bound
+            reason = lib.glp_ios_reason(tree)
+            if time_limit is not None:
+                # Borne de l'arbre gardée pour le cas où la limite de temps est atteinte
+                node = lib.glp_ios_best_node(tree)
+                if node:
+                    bound = lib.glp_ios_node_bound(tree, node)
+            if reason == GLP_IHEUR and start_ptr is not None and not proposed:
+                lib.glp_ios_heur_sol(tree, start_ptr)
+                proposed = True
+            elif reason == GLP_IBINGO and progress is not None:
+                node = lib.glp_ios_best_node(tree)
+                progress({
+                    'best_value': lib.glp_mip_obj_val(lib.glp_ios_get_prob(tree)),
+                    'bound': lib.glp_ios_node_bound(tree, node) if node else None,
+                })
+
+        if start_ptr is not None or progress is not None or time_limit is not None:
+            callback = _CALLBACK(on_event)
+            parm.cb_func = ctypes.cast(callback, ctypes.c_void_p)
+        if timings is not None:
+            timings['build'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        # Relaxation continue (requise par glp_intopt sans présolveur)
+        simplex = _Smcp()
+        lib.glp_init_smcp(ctypes.byref(simplex))
+        simplex.msg_lev = GLP_MSG_OFF
+        simplex.meth = GLP_DUALP
+        simplex.r_test = GLP_RT_FLIP
+        if time_limit is not None:
+            simplex.tm_lim = max(int(time_limit * 1000), 1)
+        code = lib.glp_simplex(problem, ctypes.byref(simplex))
+        if code == GLP_ETMLIM and start_ptr is not None:
+            if timings is not None:
+                timings['solve'] = time.perf_counter() - start
+            return np.sort(np.asarray(incumbent, dtype=np.intp)), False, None
+        if code != 0:
+            raise RuntimeError(f"GLPK n'a pas résolu la relaxation continue (code {code})")
+        if time_limit is not None:
+            parm.tm_lim = max(int((time_limit - (time.perf_counter() - start)) * 1000), 1)
+        code = lib.glp_intopt(problem, ctypes.byref(parm))
+        status = lib.glp_mip_status(problem)
+        if timings is not None:
+            timings['solve'] = time.perf_counter() - start
+        if code == GLP_ETMLIM and status not in (GLP_OPT, GLP_FEAS) and start_ptr is not None:
+            # Temps écoulé avant toute solution entière: la solution de départ reste la meilleure
+            return np.sort(np.asarray(incumbent, dtype=np.intp)), False, bound
+        if code not in (0, GLP_ETMLIM) or status not in (GLP_OPT, GLP_FEAS):
+            raise RuntimeError(f"GLPK n'a pas trouvé de solution (code {code}, statut {status})")
+
+        chosen = [j - 1 for j in range(1, n + 1) if lib.glp_mip_col_val(problem, j) > 0.5]
+        if status == GLP_OPT:
+            bound = lib.glp_mip_obj_val(problem)
+        return np.array(chosen, dtype=np.intp), status == GLP_OPT, bound
+    finally:
+        lib.glp_delete_prob(problem)
+
+
+def build_library(output=BUILD_PATH, compiler=None):
+    """Compile les sources GLPK embarquées en bibliothèque partagée"""
+    src = os.path.join(GLPK_DIR, 'src')
+    with open(os.path.join(src, 'Makefile.am'), encoding='utf-8') as f:
+        makefile = f.read()
+    block = re.search(r'libglpk_la_SOURCES = \\\n(.*?)\n\n', makefile, re.S).group(1)
+    sources = [os.path.join(src, line.strip(' \\')) for line in block.splitlines() if line.strip(' \\')]
+    includes = [src] + [os.path.join(src, name) for name in
+                        re.findall(r'-I\$\(srcdir\)/(\w+)', makefile)]
+
+    missing = [path for path in sources if not os.path.exists(path)]
+    if missing:
+        raise FileNotFoundError(f"{len(missing)} sources GLPK manquantes, par exemple {missing[0]}")
+
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with tempfile.TemporaryDirectory() as directory:
+        columns = os.path.join(directory, 'glpk_columns.c')
+        with open(columns, 'w', encoding='utf-8') as f:
+            f.write(_COLUMNS_SOURCE)
+        command = [compiler or os.environ.get('CC', 'cc'), '-shared', '-fPIC', '-O2', '-w', '-o', output]
+        command += [f'-I{path}' for path in includes] + sources + [columns, '-lm']
+        subprocess.run(command, check=True)
+    return output
+
+
+if __name__ == '__main__':
+    print(f"Bibliothèque GLPK compilée: {build_library()}")
@@ -1,65 +1,175 @@
-from datetime import datetime
-import json
+from collections import OrderedDict
+import hashlib
+import logging
 import os
+import sys
+import threading
+import time
+import numpy as np
 import pandas as pd
-from pyomo.environ import *
-import random
-from dash import dash_table, html, dcc
+
+from algorithms import ALGORITHMS, get_algorithm
+from cache import solution_key
+from config import FPTAS_EPSILON
+from datasets import item_names
+import glpk_native
+from metrics import timed
+from reduction import reduce_problem
 
 PATH = 'setup/winglpk-4.65/glpk-4.65/w64/glpsol.exe'
-OUTPUT_PATH = 'outputs/'
+logger = logging.getLogger(__name__)
+# Taille maximale (en bits) de la table de décisions de la programmation dynamique
+DP_MAX_CELLS = 2_000_000_000
+# Lignes de valeurs conservées par la programmation dynamique pour la reprise incrémentale
+DP_CHECKPOINTS = 32
+# Au-delà, l'état de la programmation dynamique n'est pas conservé
+DP_STATE_MAX_BYTES = 64 * 2 ** 20
+EXACT_ALGORITHMS = {name for name, algorithm in ALGORITHMS.items() if algorithm.exact}
+# Algorithmes précédés de la réduction de l'instance (reduction.py); le glouton n'y gagnerait rien
+REDUCED_ALGORITHMS = {name for name, algorithm in ALGORITHMS.items() if algorithm.reduced}
+# Au-delà de cette part d'objets dans le noyau, l'instance complète est résolue (et son état DP conservé)
+REDUCTION_MAX_CORE = 0.5
+# Évaluations de borne entre deux lectures de la solution partagée par le portefeuille (_branch_and_bound)
+SHARED_INTERVAL = 1024
 
+# Modèles Pyomo (par nombre d'objets) et dernières solutions exactes (par poids et valeurs) conservés
+PYOMO_MODELS_MAX = 4
+WARM_STARTS_MAX = 32
 
-def generate_items(num_items, max_capacity, max_value):
-    """Génère des objets aléatoires pour le sac à dos"""
-    items = []
-    for i in range(num_items):
-        weight = random.randint(1, max_capacity)
-        value = random.randint(1, max_value)
-        ratio = value / weight
-        
-        items.append({
-            'id': i + 1,
-            'name': f'Objet_{i+1}',
-            'weight': round(weight, 1),
-            'value': round(value, 1),
-            'ratio': round(ratio, 2)
-        })
+
+class _LRU:
+    """Dictionnaire borné, les entrées les moins récemment utilisées étant oubliées"""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+# Propres au processus: ils servent aux processus qui enchaînent les résolutions (batch.py, benchmark.py),
+# pas à l'application, dont chaque résolution a son propre processus (voir jobs.py)
+_PYOMO_MODELS = _LRU(PYOMO_MODELS_MAX)
+_PYOMO_LOCK = threading.Lock()
+_WARM_STARTS = _LRU(WARM_STARTS_MAX)
+
+
+def _instance_key(weights, values):
+    """Empreinte des poids et valeurs d'une instance (clé des solutions de départ)"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(np.ascontiguousarray(weights, dtype=np.float64).tobytes())
+    digest.update(np.ascontiguousarray(values, dtype=np.float64).tobytes())
+    return digest.hexdigest()
+
+
+def diagnostics_to_stderr():
+    """Envoie sur la sortie d'erreur ce que les moteurs écrivent sur la sortie standard (messages Pyomo...).
+
+    Initialiseur des processus de travail des outils en ligne de commande
+    (batch.py, benchmark.py), dont la sortie standard ne porte que les résultats.
+    """
+    sys.stdout = sys.stderr
+
+
+def generate_columns(num_items, max_capacity, max_value, seed=None):
+    """Génère des objets aléatoires en colonnes typées, sans les noms.
+
+    Poids et valeurs sont tirés uniformément dans [1, max_capacity] et
+    [1, max_value] par un numpy.random.Generator: la même graine redonne les
+    mêmes objets. Les noms se dérivent des id à la demande (datasets.item_names).
+    """
+    rng = np.random.default_rng(seed)
+    dtype = np.int32 if max(num_items, max_capacity, max_value) < 2 ** 31 else np.int64
+    weights = rng.integers(1, max_capacity, num_items, dtype=dtype, endpoint=True)
+    values = rng.integers(1, max_value, num_items, dtype=dtype, endpoint=True)
+    return {
+        'id': np.arange(1, num_items + 1, dtype=dtype),
+        'weight': weights,
+        'value': values,
+        'ratio': np.round(values / weights, 2),
+    }
+
+def generate_items(num_items, max_capacity, max_value, seed=None):
+    """Génère des objets aléatoires pour le sac à dos (colonnes id, name, weight, value, ratio)"""
+    columns = generate_columns(num_items, max_capacity, max_value, seed)
+    df = pd.DataFrame(columns)
+    df.insert(1, 'name', item_names(columns['id']))
+    return df
+
+def _build_pyomo_model(num_items):
+    """Construit un modèle Pyomo à paramètres mutables pour `num_items` objets"""
+    # Import différé: le chargement des extensions Pyomo est coûteux et inutile hors du repli glpsol
+    import pyomo.environ as pyo
+    model = pyo.ConcreteModel()
+    model.item_indexes = pyo.RangeSet(num_items)
     
-    return pd.DataFrame(items)
+    # Paramètres du modèle (mis à jour en place à chaque résolution)
+    model.weight = pyo.Param(model.item_indexes, mutable=True, initialize=0)
+    model.value = pyo.Param(model.item_indexes, mutable=True, initialize=0)
+    model.capacity = pyo.Param(mutable=True, initialize=0)
+    
+    # Variables de décision (binaires)
+    model.x = pyo.Var(model.item_indexes, domain=pyo.Binary)
+    
+    # Fonction objectif (maximiser la valeur)
+    model.objective = pyo.Objective(
+        expr=sum(model.value[i] * model.x[i] for i in model.item_indexes), 
+        sense=pyo.maximize
+    )
+    
+    # Contrainte de capacité
+    model.constraint = pyo.Constraint(
+        expr=sum(model.weight[i] * model.x[i] for i in model.item_indexes) <= model.capacity
+    )
+    return model
 
-def run_knapsack_optimization(items_df, max_capacity):
-    """Optimisation exacte du sac à dos avec Pyomo et GLPK"""
-    try:
-        import os
-        
-        num_items = len(items_df)
-        model = ConcreteModel()
-        model.item_indexes = RangeSet(num_items)
-        
-        # Paramètres du modèle
-        model.weight = Param(model.item_indexes, initialize={
-            i + 1: items_df.iloc[i]["Weight"] for i in range(num_items)
-        })
-        model.value = Param(model.item_indexes, initialize={
-            i + 1: items_df.iloc[i]["Value"] for i in range(num_items)
-        })
-        model.capacity = max_capacity
-        
-        # Variables de décision (binaires)
-        model.x = Var(model.item_indexes, domain=Binary)
-        
-        # Fonction objectif (maximiser la valeur)
-        model.objective = Objective(
-            expr=sum(model.value[i] * model.x[i] for i in model.item_indexes), 
-            sense=maximize
-        )
-        
-        # Contrainte de capacité
-        def capacity_constraint_rule(model):
-            return sum(model.weight[i] * model.x[i] for i in model.item_indexes) <= model.capacity
+def _warm_start(weights, values, capacity, candidates=()):
+    """Solution de départ: la meilleure solution réalisable parmi le glouton, `candidates`
+    et la dernière solution exacte des mêmes objets (quelle que soit la capacité)"""
+    incumbent = _greedy_indices(weights, values, capacity, best_single=True)
+    for previous in (*candidates, _WARM_STARTS.get(_instance_key(weights, values))):
+        if previous is not None and weights[previous].sum() <= capacity \
+                and values[previous].sum() > values[incumbent].sum():
+            incumbent = previous
+    return incumbent
+
+def _solve_with_pyomo(weights, values, max_capacity, incumbent, timings, time_limit=None, stats=None):
+    """Résout le modèle Pyomo mis en cache pour cette taille; retourne les positions choisies.
+
+    Avec `time_limit` (s), glpsol s'arrête sur sa meilleure solution entière;
+    `stats['optimal']` indique alors si l'optimalité a été prouvée.
+    """
+    from pyomo.environ import SolverFactory
+    num_items = len(weights)
+    with _PYOMO_LOCK:
+        start = time.perf_counter()
+        model = _PYOMO_MODELS.get(num_items)
+        if model is None:
+            model = _build_pyomo_model(num_items)
+            _PYOMO_MODELS.put(num_items, model)
         
-        model.constraint = Constraint(rule=capacity_constraint_rule)
+        # Mise à jour en place des paramètres et de la solution de départ
+        indexes = range(1, num_items + 1)
+        model.weight.store_values(dict(zip(indexes, weights.tolist())), check=False)
+        model.value.store_values(dict(zip(indexes, values.tolist())), check=False)
+        model.capacity.set_value(max_capacity)
+        start_values = np.zeros(num_items)
+        start_values[incumbent] = 1
+        for i, x in zip(indexes, start_values.tolist()):
+            model.x[i].set_value(x)
         
         # Résolution avec GLPK
         solver_path = PATH
@@ -68,216 +178,896 @@ def run_knapsack_optimization(items_df, max_capacity):
         else:
             # Essayer avec GLPK installé globalement
             solver = SolverFactory('glpk')
+        if time_limit is not None:
+            solver.options['tmlim'] = max(int(np.ceil(time_limit)), 1)
+        timings['build'] = time.perf_counter() - start
         
-        results = solver.solve(model, tee=False)
+        start = time.perf_counter()
+        if solver.warm_start_capable():
+            results = solver.solve(model, tee=False, warmstart=True)
+        else:
+            results = solver.solve(model, tee=False)
+        timings['solve'] = time.perf_counter() - start
         
-        # Vérifier si la solution est optimale
-        if results.solver.termination_condition.name != 'optimal':
+        # Vérifier si la solution est optimale (ou la meilleure trouvée dans le temps imparti)
+        termination = results.solver.termination_condition.name
+        interrupted = (time_limit is not None and termination == 'maxTimeLimit'
+                       and all(model.x[i].value is not None for i in model.item_indexes))
+        if termination != 'optimal' and not interrupted:
             raise Exception(f"Pas de solution optimale trouvée: {results.solver.termination_condition}")
+        if stats is not None:
+            stats['optimal'] = not interrupted
         
-        # Extraire les objets choisis
-        chosen_items = [i for i in model.item_indexes if model.x[i].value == 1]
-        results_list = [
-            (items_df.iloc[i - 1]["Item"], 
-                items_df.iloc[i - 1]["Weight"], 
-                items_df.iloc[i - 1]["Value"]) 
-            for i in chosen_items
-        ]
+        return [i - 1 for i in model.item_indexes if model.x[i].value > 0.5]
+
+def run_knapsack_optimization(items_df, max_capacity, backend='auto', progress=None, timings=None,
+                              incumbent=None, time_limit=None, stats=None):
+    """Optimisation exacte du sac à dos avec GLPK.
+
+    Par défaut ('auto' ou 'native'), la bibliothèque GLPK est appelée en mémoire
+    via glpk_native; si elle est introuvable, ou avec backend='pyomo', le modèle
+    Pyomo mis en cache pour cette taille passe par l'exécutable glpsol. Les deux
+    partent de la meilleure solution réalisable parmi `incumbent` (positions),
+    la solution précédente et le glouton. Les durées de construction, de
+    résolution sont ajoutées à `timings`. Retourne les objets choisis
+    (l'export des résultats se fait à la demande, voir export.py).
+
+    Après `time_limit` secondes, la meilleure solution entière trouvée est
+    retournée: `stats` reçoit alors `optimal` et, si le solveur en fournit
+    une, la borne supérieure prouvée (`bound`).
+    """
+    try:
+        weights = items_df["Weight"].to_numpy(dtype=float)
+        values = items_df["Value"].to_numpy(dtype=float)
+        incumbent = _warm_start(weights, values, max_capacity, () if incumbent is None else (incumbent,))
+        timings = {} if timings is None else timings
+        stats = {} if stats is None else stats
         
-        results_df = pd.DataFrame(results_list, columns=['Item', 'Weight', 'Value'])
+        if backend != 'pyomo' and glpk_native.is_available():
+            chosen_items, optimal, bound = glpk_native.solve_knapsack(
+                weights, values, max_capacity, time_limit=time_limit, incumbent=incumbent, timings=timings,
+                progress=progress
+            )
+            if not optimal and time_limit is None:
+                raise Exception("Pas de solution optimale trouvée")
+            stats['optimal'] = optimal
+            if bound is not None:
+                stats['bound'] = bound
+        else:
+            chosen_items = _solve_with_pyomo(weights, values, max_capacity, incumbent, timings, time_limit, stats)
+        _WARM_STARTS.put(_instance_key(weights, values), np.asarray(chosen_items, dtype=np.intp))
         
-        # Optionnel: sauvegarder les résultats
-        output_path = OUTPUT_PATH
-        try:
-            os.makedirs("outputs", exist_ok=True)
-            results_df.to_excel(output_path, index=False)
-        except:
-            output_path = None  # Si impossible d'écrire le fichier
-            
-        return results_df, output_path
+        # Extraire les objets choisis
+        results_df = items_df.iloc[chosen_items][[c for c in ('Item', 'Weight', 'Value') if c in items_df]]
+        results_df.index = chosen_items
+        return results_df
         
     except ImportError:
         raise Exception("Pyomo n'est pas installé. Utilisez: pip install pyomo")
     except Exception as e:
         raise Exception(f"Erreur dans l'optimisation exacte: {str(e)}")
 
-def greedy_knapsack(df, max_capacity):
-    """Algorithme glouton basé sur le ratio valeur/poids"""
-    df_sorted = df.sort_values('ratio', ascending=False)
-    
-    selected_items = []
-    total_weight = 0
-    total_value = 0
-    
-    for _, item in df_sorted.iterrows():
-        if total_weight + item['weight'] <= max_capacity:
-            selected_items.append(item.to_dict())
-            total_weight += item['weight']
-            total_value += item['value']
-    
-    return selected_items, total_weight, total_value
+def _dp_solve(weights, values, capacity, progress=None, resume=None, state=None, deadline=None, stats=None):
+    """Sac à dos 0/1 par programmation dynamique sur la capacité.
 
-def genetic_knapsack(df, max_capacity, population_size=50, generations=100):
-    """Algorithme génétique pour le sac à dos"""
-    import random
-    import numpy as np
-    
-    items = df.to_dict('records')
-    n_items = len(items)
-    
-    def create_individual():
-        """Crée un individu aléatoire"""
-        return [random.randint(0, 1) for _ in range(n_items)]
-    
-    def fitness(individual):
-        """Calcule la fitness d'un individu"""
-        total_weight = sum(items[i]['weight'] * individual[i] for i in range(n_items))
-        total_value = sum(items[i]['value'] * individual[i] for i in range(n_items))
-        
-        # Pénalité si dépasse la capacité
-        if total_weight > max_capacity:
-            return 0
-        return total_value
-    
-    def crossover(parent1, parent2):
-        """Croisement en un point"""
-        point = random.randint(1, n_items - 1)
-        child1 = parent1[:point] + parent2[point:]
-        child2 = parent2[:point] + parent1[point:]
-        return child1, child2
-    
-    def mutate(individual, mutation_rate=0.1):
-        """Mutation binaire"""
-        for i in range(len(individual)):
-            if random.random() < mutation_rate:
-                individual[i] = 1 - individual[i]
-        return individual
-    
-    # Initialisation de la population
-    population = [create_individual() for _ in range(population_size)]
-    
-    # Évolution
-    for generation in range(generations):
-        # Évaluation
-        fitness_scores = [(fitness(ind), ind) for ind in population]
-        fitness_scores.sort(reverse=True)
-        
-        # Sélection des meilleurs
-        elite_size = population_size // 4
-        new_population = [ind for _, ind in fitness_scores[:elite_size]]
-        
-        # Reproduction
-        while len(new_population) < population_size:
-            # Sélection par tournoi
-            tournament_size = 3
-            parent1 = max(random.sample(fitness_scores[:population_size//2], tournament_size))[1]
-            parent2 = max(random.sample(fitness_scores[:population_size//2], tournament_size))[1]
-            
-            child1, child2 = crossover(parent1, parent2)
-            new_population.extend([mutate(child1), mutate(child2)])
-        
-        population = new_population[:population_size]
-    
-    # Meilleure solution
-    best_fitness = max(fitness(ind) for ind in population)
-    best_individual = max(population, key=fitness)
-    
-    # Convertir en format de sortie
-    selected_items = []
-    total_weight = 0
-    total_value = 0
-    
-    for i, selected in enumerate(best_individual):
-        if selected:
-            selected_items.append(items[i])
-            total_weight += items[i]['weight']
-            total_value += items[i]['value']
-    
-    return selected_items, total_weight, total_value
+    Chaque objet met à jour toute la ligne des valeurs en un seul np.maximum;
+    les décisions sont compactées bit à bit (np.packbits) pour le retour arrière.
+    Retourne les indices des objets choisis.
 
-def run_optimization(items_data, max_capacity, algorithm):
-    """Exécute l'algorithme d'optimisation choisi"""
-    df = pd.DataFrame(items_data)
-    
+    `state` (dict) reçoit l'instance, les décisions, la ligne des valeurs
+    tous les n / DP_CHECKPOINTS objets et la dernière ligne (`frontier`:
+    optimum de chaque capacité 0..C, voir capacity_frontier et
+    frontier_selection). `resume=(state, k)` repart d'un tel
+    état, calculé pour une instance de même taille dont les k premiers objets
+    sont identiques et la capacité au moins aussi grande: seuls les objets
+    suivant le dernier point de reprise avant k sont recalculés (aucun si k = n).
+
+    Si `deadline` (time.perf_counter) est dépassée avant le dernier objet, la
+    solution optimale des objets déjà traités est complétée par le glouton sur
+    les suivants, et `stats` reçoit `optimal=False` et une borne supérieure
+    prouvée (optimum partiel + borne de Dantzig des objets restants); aucun
+    état n'est alors rangé dans `state`.
+    """
+    if np.any(weights < 0):
+        raise ValueError("les poids doivent être positifs")
+    if not np.all(np.mod(weights, 1) == 0):
+        raise ValueError("la programmation dynamique exige des poids entiers")
+
+    capacity = int(np.floor(capacity))
+    num_items = len(weights)
+    if capacity < 0 or num_items == 0:
+        return np.empty(0, dtype=np.intp)
+    if num_items * (capacity + 1) > DP_MAX_CELLS:
+        raise ValueError(f"table trop grande ({num_items} objets x capacité {capacity})")
+
+    weights = weights.astype(np.int64)
+    best = np.zeros(capacity + 1)
+    decisions = np.zeros((num_items, (capacity + 8) // 8), dtype=np.uint8)
+    taken = np.zeros(capacity + 1, dtype=bool)
+    report_every = max(num_items // 20, 1)
+    step = -(-num_items // DP_CHECKPOINTS)
+    checkpoints = []
+
+    start = 0
+    if resume is not None:
+        previous, first_changed = resume
+        if previous['capacity'] >= capacity and len(previous['decisions']) == num_items:
+            # Les lignes d'une capacité plus grande restent valables, tronquées
+            start = min(first_changed // step * step, num_items)
+            if start == num_items and 'frontier' not in previous:
+                start = (num_items - 1) // step * step
+            decisions[:start] = previous['decisions'][:start, :decisions.shape[1]]
+            checkpoints = [row[:capacity + 1] for row in previous['checkpoints'][:-(-start // step)]]
+            if start < num_items:
+                best[:] = previous['checkpoints'][start // step][:capacity + 1]
+            else:
+                best[:] = previous['frontier'][:capacity + 1]
+
+    stopped = None
+    for i in range(start, num_items):
+        if deadline is not None and time.perf_counter() >= deadline:
+            stopped = i
+            break
+        if i % step == 0:
+            checkpoints.append(best.copy())
+        if progress is not None and i % report_every == 0:
+            progress({'items': i, 'num_items': num_items, 'best_value': float(best[-1])})
+        weight, value = weights[i], values[i]
+        if value <= 0 or weight > capacity:
+            continue
+        candidate = best[:capacity + 1 - weight] + value
+        taken[:weight] = False
+        np.greater(candidate, best[weight:], out=taken[weight:])
+        np.maximum(best[weight:], candidate, out=best[weight:])
+        decisions[i] = np.packbits(taken)
+
+    if state is not None and stopped is None:
+        state.update(capacity=capacity, weights=weights, values=values, decisions=decisions,
+                     checkpoints=np.array(checkpoints), frontier=best)
+
+    # Retour arrière depuis la capacité maximale
+    chosen, remaining = _backtrack(decisions, weights, capacity)
+
+    if stopped is not None:
+        # Interruption: les lignes des objets non traités sont nulles, le retour
+        # arrière ne porte que sur les objets traités
+        rest = np.arange(stopped, num_items)
+        extra = rest[_greedy_indices(weights[rest], values[rest], remaining)]
+        chosen = np.sort(np.concatenate((chosen, extra)))
+        if stats is not None:
+            stats.update(optimal=False,
+                         bound=float(best[capacity]) + _upper_bound(weights[rest], values[rest], capacity))
+    return chosen
+
+def _backtrack(decisions, weights, capacity):
+    """Retour arrière dans les décisions depuis `capacity`; retourne (indices choisis, capacité restante)"""
+    chosen = []
+    remaining = capacity
+    for i in range(len(decisions) - 1, -1, -1):
+        if (decisions[i, remaining >> 3] >> (7 - (remaining & 7))) & 1:
+            chosen.append(i)
+            remaining -= weights[i]
+    return np.array(chosen[::-1], dtype=np.intp), remaining
+
+def capacity_frontier(best):
+    """Paliers de la courbe valeur optimale / capacité tirée de la dernière ligne de la programmation dynamique.
+
+    Retourne un dict de tableaux: `capacity` (capacités où l'optimum augmente,
+    0 compris) et `value` (optimum atteint à partir de chacune); la ligne
+    complète (une valeur par capacité) est ainsi compactée sans perte.
+    """
+    steps = np.concatenate(([0], np.flatnonzero(np.diff(best) > 0) + 1))
+    return {'capacity': steps, 'value': np.asarray(best)[steps]}
+
+def frontier_value(frontier, capacity):
+    """Valeur optimale pour une capacité quelconque, lue sur les paliers de capacity_frontier"""
+    position = int(np.searchsorted(frontier['capacity'], np.floor(capacity), side='right')) - 1
+    return float(frontier['value'][position]) if position >= 0 else 0.0
+
+def frontier_selection(state, capacity):
+    """Indices d'une sélection optimale pour toute capacité au plus égale à celle de l'état DP, sans nouveau calcul"""
+    capacity = int(np.floor(capacity))
+    if capacity > state['capacity']:
+        raise ValueError(f"capacité {capacity} au-delà du balayage ({state['capacity']})")
+    if capacity < 0:
+        return np.empty(0, dtype=np.intp)
+    return _backtrack(state['decisions'], state['weights'], capacity)[0]
+
+def dynamic_knapsack(df, max_capacity, progress=None, resume=None, state=None, deadline=None, stats=None):
+    """Programmation dynamique exacte (poids entiers), avec reprise incrémentale (voir _dp_solve)"""
+    return _dp_solve(df['weight'].to_numpy(), df['value'].to_numpy(dtype=float), max_capacity, progress,
+                     resume, state, deadline, stats)
+
+def exact_knapsack(df, max_capacity, progress=None, timings=None, incumbent=None, deadline=None, stats=None):
+    """Optimisation exacte avec GLPK; les durées par phase sont ajoutées à `timings`.
+
+    Avec `deadline` (time.perf_counter), le solveur est limité au temps restant
+    et `stats` reçoit l'optimalité et la borne prouvée (voir run_knapsack_optimization).
+    """
     df_adapted = df.rename(columns={
         'name': 'Item',
         'weight': 'Weight', 
         'value': 'Value'
     })
-    
-    if algorithm == 'dynamic':
-        # Utilisation de l'optimisation avec pyomo/glpk
+    time_limit = None if deadline is None else max(deadline - time.perf_counter(), 0.001)
+    results_df = run_knapsack_optimization(df_adapted, max_capacity, progress=progress, timings=timings,
+                                              incumbent=incumbent, time_limit=time_limit, stats=stats)
+    return results_df.index.to_numpy(dtype=np.intp)
+
+def _ratio_order(weights, values, capacity):
+    """Indices des objets utiles (valeur positive, qui tiennent) par ratio décroissant"""
+    useful = np.flatnonzero((values > 0) & (weights <= capacity))
+    ratios = np.divide(values[useful], weights[useful],
+                       out=np.full(len(useful), np.inf), where=weights[useful] > 0)
+    return useful[np.argsort(-ratios, kind='stable')]
+
+def _greedy_indices(weights, values, capacity, best_single=False):
+    """Glouton par ratio décroissant sur tableaux NumPy; retourne les indices choisis.
+
+    Les blocs d'objets consécutifs qui tiennent sont pris d'un coup grâce aux
+    sommes cumulées des poids; seuls les objets critiques sont sautés un par un.
+    Avec `best_single`, le meilleur objet seul remplace le glouton s'il vaut
+    plus (garantie d'approximation 1/2).
+    """
+    order = _ratio_order(weights, values, capacity)
+    sorted_weights = weights[order]
+    n = len(order)
+
+    cum_w = np.concatenate(([0], np.cumsum(sorted_weights)))
+    min_w = np.minimum.accumulate(sorted_weights[::-1])[::-1]
+    blocks = []
+    pos, residual = 0, capacity
+    while pos < n:
+        end = int(np.searchsorted(cum_w, cum_w[pos] + residual, side='right')) - 1
+        if end > pos:
+            blocks.append(order[pos:end])
+            residual -= cum_w[end] - cum_w[pos]
+            pos = end
+        # L'objet critique ne tient pas: passer au prochain objet qui tient encore
+        if pos >= n - 1 or min_w[pos + 1] > residual:
+            break
+        pos += 1 + int(np.argmax(sorted_weights[pos + 1:] <= residual))
+
+    chosen = np.concatenate(blocks) if blocks else np.empty(0, dtype=np.intp)
+    if best_single and n:
+        best = order[np.argmax(values[order])]
+        if values[best] > values[chosen].sum():
+            chosen = np.array([best], dtype=np.intp)
+    return np.sort(chosen)
+
+def _dantzig_bound(cum_p, cum_w, p, w, capacity):
+    """Borne de la relaxation continue pour des objets triés par ratio décroissant"""
+    k = int(np.searchsorted(cum_w, capacity, side='right')) - 1
+    bound = cum_p[k]
+    if k < len(p):
+        bound += (capacity - cum_w[k]) * p[k] / w[k]
+    return float(bound)
+
+def _upper_bound(weights, values, capacity):
+    """Borne de Dantzig d'une instance quelconque"""
+    order = _ratio_order(weights, values, capacity)
+    p = values[order].astype(float)
+    w = weights[order].astype(float)
+    return _dantzig_bound(np.concatenate(([0.0], np.cumsum(p))), np.concatenate(([0.0], np.cumsum(w))),
+                          p, w, capacity)
+
+def _branch_and_bound(weights, values, capacity, incumbent=None, max_nodes=None, progress=None, deadline=None,
+                      shared=None):
+    """Séparation et évaluation de Horowitz-Sahni (profondeur d'abord).
+
+    Les objets sont triés par ratio décroissant; la borne de Dantzig (relaxation
+    continue) est calculée en O(log n) grâce aux sommes cumulées des poids et
+    valeurs. La solution initiale est fournie par `incumbent` (indices) ou par
+    le glouton. `max_nodes` limite le nombre d'évaluations de borne (nœuds
+    élagués compris) et `deadline` (time.perf_counter) la durée de la
+    recherche. Retourne les indices choisis et les compteurs de recherche;
+    une recherche interrompue y ajoute la borne supérieure prouvée (`bound`).
+
+    `shared` (portfolio.SharedIncumbent) est la meilleure solution connue des
+    moteurs lancés en parallèle: la recherche y publie ses améliorations et,
+    toutes les SHARED_INTERVAL évaluations de borne, reprend une solution
+    publiée meilleure que la sienne pour élaguer davantage.
+    """
+    if incumbent is None:
+        incumbent = _greedy_indices(weights, values, capacity, best_single=True)
+    best_value = float(values[incumbent].sum())
+
+    # Seuls les objets utiles et qui tiennent dans le sac participent à la recherche
+    order = _ratio_order(weights, values, capacity)
+    p = values[order].astype(float)
+    w = weights[order].astype(float)
+    n = len(order)
+
+    cum_p = np.concatenate(([0.0], np.cumsum(p)))
+    cum_w = np.concatenate(([0.0], np.cumsum(w)))
+    min_w = np.concatenate((np.minimum.accumulate(w[::-1])[::-1], [np.inf])).tolist()
+    integral = bool(np.all(np.mod(p, 1) == 0))
+    tol = 1e-9 * max(1.0, float(cum_p[-1]))
+
+    stats = {'nodes': 0, 'bounds': 0, 'pruned': 0, 'optimal': True}
+    root_bound = _dantzig_bound(cum_p, cum_w, p, w, capacity)
+    best_x = None
+    x = np.zeros(n, dtype=bool)
+    blocks = []  # blocs [début, fin) d'objets pris consécutivement
+    j, residual, current = 0, float(capacity), 0.0
+
+    while True:
+        backtrack = False
+        if j < n and min_w[j] <= residual:
+            # Borne de Dantzig: objets j..k-1 entiers, fraction de l'objet critique k
+            k = int(np.searchsorted(cum_w, cum_w[j] + residual, side='right')) - 1
+            bound = cum_p[k] - cum_p[j]
+            if k < n:
+                bound += (residual - (cum_w[k] - cum_w[j])) * p[k] / w[k]
+            stats['bounds'] += 1
+            if shared is not None and stats['bounds'] % SHARED_INTERVAL == 0 and shared.value > best_value + tol:
+                best_value, incumbent = shared.read()
+                best_x = None
+            if integral:
+                bound = np.floor(bound + tol)
+            if current + bound <= best_value + tol:
+                stats['pruned'] += 1
+                backtrack = True
+            else:
+                # Avancée: prendre le bloc j..k-1, l'objet critique k est exclu
+                stats['nodes'] += 1
+                if progress is not None and stats['nodes'] % 10000 == 0:
+                    progress({'nodes': stats['nodes'], 'best_value': best_value, 'bound': root_bound})
+                if k > j:
+                    x[j:k] = True
+                    blocks.append([j, k])
+                    residual -= cum_w[k] - cum_w[j]
+                    current += cum_p[k] - cum_p[j]
+                j = k + 1
+        else:
+            # Feuille: plus aucun objet ne tient
+            if current > best_value + tol:
+                best_value = current
+                best_x = x.copy()
+                if shared is not None:
+                    shared.publish(order[best_x], best_value)
+            backtrack = True
+
+        if backtrack:
+            if not blocks or (max_nodes is not None and stats['bounds'] >= max_nodes) \
+                    or (deadline is not None and time.perf_counter() >= deadline):
+                stats['optimal'] = not blocks
+                if blocks:
+                    stats['bound'] = max(best_value, _open_bound(x, cum_p, cum_w, p, w, capacity, integral, tol))
+                break
+            # Retirer le dernier objet pris et explorer la branche x_i = 0
+            block = blocks[-1]
+            i = block[1] - 1
+            x[i] = False
+            residual += w[i]
+            current -= p[i]
+            if i == block[0]:
+                blocks.pop()
+            else:
+                block[1] = i
+            j = i + 1
+
+    if best_x is None:
+        return np.sort(incumbent), stats
+    return np.sort(order[best_x]), stats
+
+def _open_bound(x, cum_p, cum_w, p, w, capacity, integral, tol):
+    """Meilleure borne des branches non explorées d'une recherche interrompue.
+
+    En profondeur d'abord, les sous-arbres encore ouverts sont exactement les
+    branches x_i = 0 des objets pris sur le chemin courant `x`: décisions
+    précédentes fixées, objets suivants libres.
+    """
+    taken = np.flatnonzero(x)
+    value_before = np.concatenate(([0.0], np.cumsum(p[taken])[:-1]))
+    residuals = capacity - np.concatenate(([0.0], np.cumsum(w[taken])[:-1]))
+    starts = taken + 1
+    ends = np.searchsorted(cum_w, cum_w[starts] + residuals, side='right') - 1
+    bounds = cum_p[ends] - cum_p[starts]
+    partial = ends < len(p)
+    critical = ends[partial]
+    bounds[partial] += (residuals[partial] - (cum_w[critical] - cum_w[starts[partial]])) * p[critical] / w[critical]
+    if integral:
+        bounds = np.floor(bounds + tol)
+    return float((value_before + bounds).max())
+
+def branch_and_bound_knapsack(df, max_capacity, max_nodes=None, progress=None, incumbent=None, deadline=None,
+                              shared=None):
+    """Séparation et évaluation exacte, adaptée aux grandes capacités et poids réels"""
+    weights = df['weight'].to_numpy(dtype=float)
+    values = df['value'].to_numpy(dtype=float)
+    if incumbent is not None:
+        incumbent = _warm_start(weights, values, max_capacity, (incumbent,))
+    return _branch_and_bound(weights, values, max_capacity, incumbent=incumbent, max_nodes=max_nodes,
+                             progress=progress, deadline=deadline, shared=shared)
+
+def greedy_knapsack(df, max_capacity, best_single=False):
+    """Algorithme glouton basé sur le ratio valeur/poids; retourne les indices choisis"""
+    return _greedy_indices(df['weight'].to_numpy(), df['value'].to_numpy(dtype=float),
+                           max_capacity, best_single)
+
+def _repair(population, weights, capacity):
+    """Réparation gloutonne vectorisée de toute une population.
+
+    Les colonnes sont triées par ratio décroissant: les individus trop lourds
+    perdent leurs objets de plus faible ratio jusqu'à respecter la capacité,
+    puis chaque individu est complété avec les objets non choisis de meilleur
+    ratio qui tiennent encore.
+    """
+    loads = population @ weights
+    over = np.flatnonzero(loads > capacity)
+    if len(over):
+        chosen = population[over]
+        chosen_weights = chosen * weights
+        removed_after = np.cumsum(chosen_weights[:, ::-1], axis=1, dtype=weights.dtype)[:, ::-1]
+        removed_after -= chosen_weights
+        chosen &= removed_after >= (loads[over] - capacity)[:, None]
+        population[over] = chosen
+        loads[over] = chosen @ weights
+
+    free = ~population
+    population |= free & (np.cumsum(free * weights, axis=1, dtype=weights.dtype)
+                          <= (capacity - loads)[:, None])
+    return population
+
+def _genetic_solve(weights, values, capacity, population_size=50, generations=100,
+                   mutation_rate=None, seed=None, progress=None, incumbent=None, deadline=None, migrate=None,
+                   trace=None, shared=None):
+    """Algorithme génétique matriciel; retourne les indices du meilleur individu.
+
+    La population est une matrice booléenne (individus x objets): la fitness
+    d'une génération est un produit matrice-vecteur, le croisement et la
+    mutation sont des masques. `incumbent` (indices d'une solution, par exemple
+    la précédente) est placé, réparé, dans la population initiale. L'évolution
+    s'arrête avant `generations` si `deadline` (time.perf_counter) est dépassée.
+
+    Modèle en îles (voir islands.py): `migrate(génération, population,
+    fitness)` est appelé après chaque génération et retourne la population et
+    la fitness, éventuellement enrichies de migrants; les individus y sont
+    exprimés sur les objets utiles triés par ratio décroissant. `trace` (liste)
+    reçoit la meilleure fitness de chaque génération.
+
+    `shared` (portfolio.SharedIncumbent) est la meilleure solution connue des
+    moteurs lancés en parallèle: après chaque génération, le meilleur individu
+    y est publié s'il l'améliore, sinon la solution publiée, si elle est
+    meilleure, remplace le pire individu.
+    """
+    rng = np.random.default_rng(seed)
+
+    # Seuls les objets utiles participent, triés par ratio décroissant pour la réparation
+    order = _ratio_order(weights, values, capacity)
+    weights, values = weights[order], values[order].astype(float)
+    n_items = len(order)
+    # Des poids entiers en int32 accélèrent nettement les sommes cumulées de la réparation
+    if np.all(np.mod(weights, 1) == 0) and weights.sum() < 2 ** 31:
+        weights = weights.astype(np.int32)
+    else:
+        weights = weights.astype(float)
+    if n_items == 0:
+        return order
+    if mutation_rate is None:
+        mutation_rate = 1 / n_items
+
+    # Initialisation de la population
+    population = rng.random((population_size, n_items)) < 0.5
+    if incumbent is not None:
+        population[0] = np.isin(order, incumbent)
+    population = _repair(population, weights, capacity)
+    fitness = population @ values
+
+    elite_size = max(population_size // 4, 1)
+    n_children = population_size - elite_size
+    n_pairs = (n_children + 1) // 2
+    tournament_size = 3
+    positions = np.arange(n_items)
+
+    # Évolution
+    for generation in range(generations):
+        ranking = np.argsort(-fitness, kind='stable')
+        elite = ranking[:elite_size]
+
+        # Sélection par tournoi parmi la meilleure moitié
+        best_half = ranking[:max(population_size // 2, 1)]
+        contestants = best_half[rng.integers(len(best_half), size=(2, n_pairs, tournament_size))]
+        winners = np.take_along_axis(
+            contestants, fitness[contestants].argmax(axis=-1)[..., None], axis=-1)[..., 0]
+        parent1, parent2 = population[winners[0]], population[winners[1]]
+
+        # Croisement en un point
+        if n_items > 1:
+            mask = positions < rng.integers(1, n_items, size=n_pairs)[:, None]
+            children = np.concatenate((np.where(mask, parent1, parent2),
+                                       np.where(mask, parent2, parent1)))[:n_children]
+        else:
+            children = np.concatenate((parent1, parent2))[:n_children]
+
+        # Mutation binaire (positions tirées directement) puis réparation
+        flips = rng.binomial(n_items, mutation_rate, size=len(children))
+        rows = np.repeat(np.arange(len(children)), flips)
+        children[rows, rng.integers(n_items, size=len(rows))] ^= True
+        children = _repair(children, weights, capacity)
+
+        population = np.concatenate((population[elite], children))
+        fitness = np.concatenate((fitness[elite], children @ values))
+        if migrate is not None:
+            population, fitness = migrate(generation, population, fitness)
+        if shared is not None:
+            best = fitness.argmax()
+            if fitness[best] > shared.value:
+                shared.publish(order[population[best]], float(fitness[best]))
+            elif shared.value > fitness[best]:
+                worst = fitness.argmin()
+                population[worst] = _repair(np.isin(order, shared.read()[1])[None], weights, capacity)[0]
+                fitness[worst] = population[worst] @ values
+        if trace is not None:
+            trace.append(float(fitness.max()))
+        if progress is not None:
+            progress({'generation': generation + 1, 'generations': generations,
+                      'best_value': float(fitness.max())})
+        if deadline is not None and time.perf_counter() >= deadline:
+            break
+
+    return np.sort(order[population[fitness.argmax()]])
+
+def genetic_knapsack(df, max_capacity, population_size=50, generations=100,
+                     mutation_rate=None, seed=None, progress=None, incumbent=None, deadline=None, shared=None):
+    """Algorithme génétique pour le sac à dos; retourne les indices choisis"""
+    return _genetic_solve(df['weight'].to_numpy(dtype=float), df['value'].to_numpy(dtype=float),
+                          max_capacity, population_size, generations, mutation_rate, seed, progress,
+                          incumbent, deadline, shared=shared)
+
+def _fptas_solve(weights, values, capacity, epsilon=FPTAS_EPSILON, progress=None, deadline=None):
+    """Schéma d'approximation (FPTAS): programmation dynamique sur les valeurs arrondies.
+
+    Les valeurs sont divisées par K = epsilon * L / n (L: valeur du glouton
+    avec meilleur objet, au moins la moitié de l'optimum) puis tronquées; la
+    table donne le poids minimal de chaque valeur arrondie jusqu'à la borne de
+    Dantzig / K, soit au plus 2n / epsilon colonnes: mémoire et temps en
+    O(n² / epsilon), indépendants de la capacité et des poids (réels admis).
+    La solution vaut au moins (1 - epsilon) fois l'optimum; la capacité laissée
+    est complétée par le glouton. Retourne les indices choisis et des
+    statistiques: `epsilon`, `guarantee` (1 - epsilon, None si `deadline` a
+    interrompu le calcul) et la borne supérieure prouvée (`bound`).
+    """
+    if not 0 < epsilon < 1:
+        raise ValueError(f"epsilon doit être compris entre 0 et 1 (exclus): {epsilon}")
+    if np.any(weights < 0):
+        raise ValueError("les poids doivent être positifs")
+
+    useful = np.flatnonzero((values > 0) & (weights <= capacity))
+    incumbent = _greedy_indices(weights, values, capacity, best_single=True)
+    lower = float(values[incumbent].sum())
+    stats = {'epsilon': epsilon, 'guarantee': 1 - epsilon}
+    num_items = len(useful)
+    if num_items == 0:
+        return incumbent, dict(stats, bound=lower)
+
+    scale = epsilon * lower / num_items
+    scaled = np.floor(values[useful] / scale).astype(np.int64)
+    # Les arrondis flottants peuvent placer un objet seul juste au-delà de la borne
+    size = max(int(_upper_bound(weights[useful], values[useful], capacity) // scale), int(scaled.max())) + 1
+    if num_items * size > DP_MAX_CELLS:
+        raise ValueError(f"table trop grande ({num_items} objets x {size} valeurs arrondies)")
+    w = weights[useful].astype(float)
+    lightest = np.full(size, np.inf)
+    lightest[0] = 0.0
+    decisions = np.zeros((num_items, (size + 7) // 8), dtype=np.uint8)
+    taken = np.zeros(size, dtype=bool)
+    report_every = max(num_items // 20, 1)
+
+    stopped = num_items
+    for i in range(num_items):
+        if deadline is not None and time.perf_counter() >= deadline:
+            stopped = i
+            break
+        if progress is not None and i % report_every == 0:
+            progress({'items': i, 'num_items': num_items,
+                      'best_value': scale * float(np.flatnonzero(lightest <= capacity)[-1])})
+        value = scaled[i]
+        if value == 0:
+            continue
+        candidate = lightest[:size - value] + w[i]
+        taken[:value] = False
+        np.less(candidate, lightest[value:], out=taken[value:])
+        np.minimum(lightest[value:], candidate, out=lightest[value:])
+        decisions[i] = np.packbits(taken)
+
+    # Meilleure valeur arrondie atteignable, puis retour arrière sur les valeurs arrondies
+    reached = int(np.flatnonzero(lightest <= capacity)[-1])
+    chosen = useful[_backtrack(decisions[:stopped], scaled, reached)[0]]
+    rest = np.setdiff1d(useful, chosen)
+    chosen = np.concatenate((chosen, rest[_greedy_indices(weights[rest], values[rest],
+                                                          capacity - weights[chosen].sum())]))
+    if values[chosen].sum() < lower:
+        chosen = incumbent
+
+    # Chaque objet perd moins de K à l'arrondi: l'optimum des objets traités est
+    # inférieur à K * (valeur arrondie atteinte + nombre d'objets)
+    bound = scale * (reached + stopped)
+    if stopped < num_items:
+        rest = useful[stopped:]
+        bound += _upper_bound(weights[rest], values[rest], capacity)
+        stats['guarantee'] = None
+    else:
+        bound = min(bound, float(values[chosen].sum()) / (1 - epsilon))
+    return np.sort(chosen), dict(stats, bound=bound)
+
+def fptas_knapsack(df, max_capacity, epsilon=FPTAS_EPSILON, progress=None, deadline=None):
+    """Approximation à (1 - epsilon) près de l'optimum, quelle que soit la capacité (voir _fptas_solve)"""
+    return _fptas_solve(df['weight'].to_numpy(dtype=float), df['value'].to_numpy(dtype=float), max_capacity,
+                        epsilon, progress, deadline)
+
+# Moteurs du registre (algorithms.py): signature commune, retournent (indices, statistiques)
+def _run_dynamic(df, max_capacity, params, progress, timings, incumbent, resume, state, deadline):
+    stats = {}
+    return dynamic_knapsack(df, max_capacity, progress, resume, state, deadline, stats), stats
+
+def _run_exact(df, max_capacity, params, progress, timings, incumbent, resume, state, deadline):
+    stats = {}
+    return exact_knapsack(df, max_capacity, progress, timings, incumbent, deadline, stats), stats
+
+def _run_branch_bound(df, max_capacity, params, progress, timings, incumbent, resume, state, deadline):
+    return branch_and_bound_knapsack(df, max_capacity, progress=progress, incumbent=incumbent, deadline=deadline,
+                                     **params)
+
+def _run_genetic(df, max_capacity, params, progress, timings, incumbent, resume, state, deadline):
+    return genetic_knapsack(df, max_capacity, progress=progress, incumbent=incumbent, deadline=deadline,
+                            **params), {}
+
+def _run_greedy(df, max_capacity, params, progress, timings, incumbent, resume, state, deadline):
+    return greedy_knapsack(df, max_capacity), {}
+
+def _run_greedy_best(df, max_capacity, params, progress, timings, incumbent, resume, state, deadline):
+    return greedy_knapsack(df, max_capacity, best_single=True), {}
+
+def _run_fptas(df, max_capacity, params, progress, timings, incumbent, resume, state, deadline):
+    return fptas_knapsack(df, max_capacity, progress=progress, deadline=deadline, **params)
+
+def _solve(df, max_capacity, algorithm, params, progress=None, timings=None, incumbent=None,
+           resume=None, state=None, deadline=None):
+    """Exécute l'algorithme choisi; retourne (indices, algorithme effectif, statistiques, repli).
+
+    Le moteur est celui déclaré au registre (algorithms.py). S'il échoue (ou
+    si l'algorithme exige des poids entiers qui ne le sont pas), son
+    algorithme de repli est essayé; `repli` indique que la solution vient
+    alors d'un algorithme approché. Les phases mesurées par le solveur sont
+    ajoutées à `timings`. `incumbent` (positions d'une solution connue) sert
+    de point de départ aux solveurs MIP, séparation et évaluation et
+    génétique; `resume` et `state` sont transmis à la programmation
+    dynamique. `deadline` (time.perf_counter) borne la durée des algorithmes
+    qui le déclarent, qui retournent alors leur meilleure solution.
+    'portfolio' lance plusieurs moteurs en parallèle (voir
+    portfolio.solve_portfolio; `params` par moteur), 'genetic_islands'
+    l'algorithme génétique en îles (voir islands.solve_islands), 'fptas'
+    l'approximation à (1 - epsilon) près (voir _fptas_solve; `params`: epsilon).
+    """
+    fallback = False
+    integral = None
+    while True:
+        engine = get_algorithm(algorithm)
         try:
-            results_df, _ = run_knapsack_optimization(df_adapted, max_capacity)
-            selected_items = []
-            
-            # Convertir les résultats en format attendu
-            for _, row in results_df.iterrows():
-                # Retrouver l'item original avec ses données complètes
-                original_item = df[df['name'] == row['Item']].iloc[0]
-                selected_items.append({
-                    'id': original_item['id'],
-                    'name': original_item['name'],
-                    'weight': original_item['weight'],
-                    'value': original_item['value'],
-                    'ratio': original_item['ratio']
-                })
-            
-            total_weight = results_df['Weight'].sum()
-            total_value = results_df['Value'].sum()
-            
-        except Exception as e:
-            print(f"Erreur avec l'optimisation exacte: {e}")
-            # Fallback vers algorithme glouton
-            algorithm = 'greedy'
-            selected_items, total_weight, total_value = greedy_knapsack(df, max_capacity)
+            if engine.integer_weights:
+                if integral is None:
+                    integral = bool(np.all(np.mod(df['weight'].to_numpy(), 1) == 0))
+                if not integral:
+                    raise ValueError("poids non entiers")
+            chosen, stats = engine.load()(df, max_capacity, params, progress, timings, incumbent, resume, state,
+                                          deadline)
+            return chosen, algorithm, stats, fallback
+        except engine.fallback_on as e:
+            if engine.fallback is None:
+                raise
+            logger.warning("Algorithme %s impossible (%s): repli sur %s", algorithm, e, engine.fallback)
+            algorithm = engine.fallback
+            fallback = fallback or not get_algorithm(algorithm).exact
+
+def _reduced_solve(df, max_capacity, algorithm, params, progress=None, timings=None, incumbent=None,
+                   state=None, deadline=None):
+    """Réduit l'instance (reduction.reduce_problem) puis résout le noyau avec _solve.
+
+    La solution du noyau est complétée par les objets fixés et comparée à la
+    solution de départ qui a servi à la réduction; la borne prouvée du noyau
+    est ramenée à l'instance complète. Si le noyau garde plus de
+    REDUCTION_MAX_CORE des objets, l'instance complète est résolue (avec
+    `state`). Retourne comme _solve, la taille de chaque groupe d'objets étant
+    rangée dans `stats['reduction']`.
+    """
+    weights = df['weight'].to_numpy(dtype=float)
+    values = df['value'].to_numpy(dtype=float)
+    with timed(timings, 'reduce'):
+        lower = _warm_start(weights, values, max_capacity, () if incumbent is None else (incumbent,))
+        reduction = reduce_problem(weights, values, max_capacity, lower)
+    free, offset = reduction['free'], reduction['value']
+    if len(free) > REDUCTION_MAX_CORE * len(df):
+        chosen, algorithm, stats, fallback = _solve(df, max_capacity, algorithm, params, progress, timings,
+                                                    incumbent, None, state, deadline)
+        return chosen, algorithm, dict(stats, reduction=dict(reduction['stats'], applied=False)), fallback
+
+    core_progress = None
+    if progress is not None:
+        def core_progress(info):
+            # Valeurs du noyau ramenées à l'instance complète
+            progress({name: value + offset if name in ('best_value', 'bound') and value is not None else value
+                      for name, value in info.items()})
+
+    chosen, stats, fallback = reduction['fixed'], {}, False
+    if len(free):
+        core, algorithm, stats, fallback = _solve(df.iloc[free].reset_index(drop=True), reduction['capacity'],
+                                                  algorithm, params, core_progress, timings,
+                                                  np.flatnonzero(np.isin(free, lower)), deadline=deadline)
+        chosen = np.sort(np.concatenate((chosen, free[np.asarray(core, dtype=np.intp)])))
+    stats = dict(stats, reduction=dict(reduction['stats'], applied=True))
+    lower_value = float(values[lower].sum())
+    if lower_value > values[chosen].sum():
+        chosen = np.sort(lower)
+    if 'bound' in stats:
+        stats['bound'] = max(lower_value, stats['bound'] + offset)
+    return chosen, algorithm, stats, fallback
+
+def _still_optimal(previous, weights, values, capacity):
+    """Indique si la solution optimale `previous` reste optimale pour l'instance modifiée.
+
+    Sans résolution: vrai si les modifications ne peuvent qu'avantager la
+    solution par rapport à toutes les autres (capacité et poids qui ne
+    baissent pas, valeurs des objets choisis qui ne baissent pas, valeurs des
+    autres qui ne montent pas), ou si sa valeur atteint la borne de Dantzig.
+    """
+    chosen = previous['chosen']
+    if not previous.get('optimal') or len(previous['weights']) != len(weights) \
+            or weights[chosen].sum() > capacity:
+        return False
+
+    selected = np.zeros(len(weights), dtype=bool)
+    selected[chosen] = True
+    weight_delta = weights - previous['weights']
+    value_delta = values - previous['values']
+    if capacity <= previous['capacity'] and np.all(weight_delta >= 0) \
+            and np.all(value_delta[selected] >= 0) and np.all(value_delta[~selected] <= 0):
+        return True
+
+    bound = _upper_bound(weights, values, capacity)
+    if np.all(np.mod(values, 1) == 0):
+        bound = np.floor(bound + 1e-9)
+    return values[chosen].sum() >= bound - 1e-9 * max(1.0, bound)
+
+def run_optimization(items_data, max_capacity, algorithm, params=None, cache=None, progress=None,
+                     records=True, previous=None, keep_state=False, time_limit=None, reduce=True, sweep=False):
+    """Exécute l'algorithme d'optimisation choisi.
+
+    Options: `cache` (cache.SolutionCache), reprise incrémentale depuis
+    `previous`, budget `time_limit` (secondes), réduction (`reduce`) et
+    balayage de toutes les capacités (`sweep`, voir capacity_frontier).
+    Retourne `chosen`, `selected_items`, `state`, `frontier` et `summary`.
+    """
+    timings = {}
+    start = time.perf_counter()
+    deadline = None if time_limit is None else start + time_limit
+    if progress is not None:
+        report = progress
+
+        def progress(info):
+            report(dict(info, elapsed=time.perf_counter() - start, time_limit=time_limit))
+    requested_algorithm = algorithm
+    if algorithm == 'sweep':
+        sweep = True
+    if sweep:
+        # Entrée 'sweep' du registre: programmation dynamique complète, sans réduction
+        algorithm, reduce = 'sweep', False
+    with timed(timings, 'dataframe'):
+        df = pd.DataFrame(items_data)
+    params = params or {}
+    
+    key = None
+    entry = None
+    if cache is not None and not sweep:
+        with timed(timings, 'cache'):
+            key = solution_key(df['weight'].to_numpy(dtype=float), df['value'].to_numpy(dtype=float),
+                               max_capacity, algorithm, dict(params, reduce=bool(reduce)))
+            entry = cache.get(key)
     
-    elif algorithm == 'genetic':
-        selected_items, total_weight, total_value = genetic_knapsack(df, max_capacity)
+    fallback = False
+    timed_out = False
+    incremental = None
+    state = {} if keep_state or sweep else None
+    incumbent = resume = None
+    # La résolution précédente ne sert qu'au même algorithme, ou à un algorithme exact si elle est prouvée optimale
+    if entry is None and previous is not None and len(previous['weights']) == len(df) \
+            and (previous['algorithm'] == algorithm
+                 or (get_algorithm(algorithm).exact and previous.get('optimal'))):
+        weights = df['weight'].to_numpy(dtype=float)
+        values = df['value'].to_numpy(dtype=float)
+        with timed(timings, 'bound'):
+            unchanged = not sweep and _still_optimal(previous, weights, values, max_capacity)
+        previous_state = previous.get('state')
+        if unchanged:
+            entry = {'chosen': previous['chosen'], 'algorithm': previous['algorithm'], 'stats': {}}
+            incremental = 'skipped'
+            # L'état décrit sa propre instance: il reste utilisable pour la prochaine reprise
+            if keep_state and previous_state is not None:
+                state = previous_state
+        else:
+            if previous_state is not None and len(previous_state['weights']) == len(df):
+                changed = np.flatnonzero((weights != previous_state['weights'])
+                                         | (values != previous_state['values']))
+                resume = (previous_state, int(changed[0]) if len(changed) else len(df))
+            if weights[previous['chosen']].sum() <= max_capacity:
+                incumbent = np.asarray(previous['chosen'], dtype=np.intp)
+            incremental = 'dp_resume' if resume is not None and algorithm in ('dynamic', 'sweep') else 'warm_start'
+    
+    if entry is not None:
+        chosen, algorithm, stats = entry['chosen'], entry['algorithm'], entry['stats']
+    else:
+        solve_start = time.perf_counter()
+        if reduce and resume is None and algorithm in REDUCED_ALGORITHMS:
+            chosen, algorithm, stats, fallback = _reduced_solve(df, max_capacity, algorithm, params, progress,
+                                                                timings, incumbent, state, deadline)
+        else:
+            chosen, algorithm, stats, fallback = _solve(df, max_capacity, algorithm, params, progress, timings,
+                                                        incumbent, resume, state, deadline)
+        # Le temps non attribué à la réduction ou à la construction revient à la résolution
+        elapsed = time.perf_counter() - solve_start
+        timings['solve'] = elapsed - sum(timings.get(phase, 0.0) for phase in ('reduce', 'build'))
+        # Budget dépassé sans preuve d'optimalité: solution interrompue
+        timed_out = deadline is not None and time.perf_counter() >= deadline \
+            and not (algorithm in EXACT_ALGORITHMS and stats.get('optimal', True))
+        # Un repli sur le glouton ou une solution interrompue n'est pas mis en cache:
+        # le calcul sera repris
+        if key is not None and not fallback and not timed_out:
+            with timed(timings, 'cache'):
+                cache.put(key, {'chosen': np.asarray(chosen).tolist(), 'algorithm': algorithm, 'stats': stats})
     
-    else:  # algorithm == 'greedy'
-        selected_items, total_weight, total_value = greedy_knapsack(df, max_capacity)
+    # Matérialisation des objets choisis au format attendu par l'interface
+    with timed(timings, 'extract'):
+        chosen = np.asarray(chosen, dtype=np.intp)
+        selected = df.iloc[chosen]
+        selected_items = selected.to_dict('records') if records else None
+        total_weight = selected['weight'].sum()
+        total_value = selected['value'].sum()
     
     efficiency = (total_weight / max_capacity) * 100 if max_capacity > 0 else 0
+    optimal = algorithm in EXACT_ALGORITHMS and bool(stats.get('optimal', True))
+    stats = dict(stats)
+    upper_bound = stats.pop('bound', None)
+    if optimal:
+        upper_bound = total_value
+    else:
+        # La borne du solveur, si elle existe, est resserrée par celle de Dantzig
+        with timed(timings, 'bound'):
+            values = df['value'].to_numpy(dtype=float)
+            dantzig = _upper_bound(df['weight'].to_numpy(dtype=float), values, max_capacity)
+            upper_bound = dantzig if upper_bound is None else min(upper_bound, dantzig)
+            if np.all(np.mod(values, 1) == 0):
+                upper_bound = np.floor(upper_bound + 1e-9)
+    upper_bound = max(float(upper_bound), float(total_value))
+    gap = (upper_bound - total_value) / upper_bound if upper_bound > 0 else 0.0
+    frontier = capacity_frontier(state['frontier']) if sweep and state and 'frontier' in state else None
+    if frontier is not None:
+        stats['sweep'] = {'capacity': int(state['capacity']), 'steps': len(frontier['capacity'])}
+    if not keep_state or not state or sum(np.asarray(array).nbytes for array in state.values()) > DP_STATE_MAX_BYTES:
+        state = None
     
     return {
+        'chosen': chosen,
+        'state': state,
+        'frontier': frontier,
         'selected_items': selected_items,
         'summary': {
             'total_value': round(total_value, 2),
             'total_weight': round(total_weight, 2),
             'efficiency': round(efficiency, 2),
             'algorithm': algorithm,
+            'requested_algorithm': requested_algorithm,
+            'fallback': fallback,
             'capacity_used': f"{total_weight:.1f}/{max_capacity}",
-            'num_selected': len(selected_items)
+            'num_selected': len(chosen),
+            'cache_hit': entry is not None and incremental != 'skipped',
+            'incremental': incremental,
+            'time_limit': time_limit,
+            'timed_out': timed_out,
+            'upper_bound': round(upper_bound, 2),
+            'gap': round(gap, 6),
+            'timings': {phase: round(seconds, 6) for phase, seconds in timings.items()},
+            **stats,
+            'optimal': optimal,
         }
     }
-
-def prepare_download_data(items_data, results_data, max_capacity):
-    """Prépare les données pour le téléchargement"""
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    
-    # Créer un rapport complet
-    report = {
-        'configuration': {
-            'max_capacity': max_capacity,
-            'total_items': len(items_data) if items_data else 0,
-            'timestamp': timestamp
-        },
-        'all_items': items_data,
-        'optimization_results': results_data
-    }
-    os.makedirs(os.path.dirname(OUTPUT_PATH), exist_ok=True)
-
-    # Construire le chemin complet du fichier JSON
-    filename = f"knapsack_results_{timestamp}.json"
-    full_path = os.path.join(os.path.dirname(OUTPUT_PATH), filename)
-
-    # Sauvegarder le fichier JSON
-    with open(full_path, 'w', encoding='utf-8') as f:
-        json.dump(report, f, indent=2, ensure_ascii=False)
-
-    # Retourner un dict avec le contenu et le chemin du fichier pour téléchargement
-    return dict(
-        content=json.dumps(report, indent=2, ensure_ascii=False),
-        filename=filename
-    )
@@ -0,0 +1,199 @@
+"""Algorithme génétique en îles: une population par processus, avec migration.
+
+Chaque île fait évoluer sa population avec helpers._genetic_solve. Toutes les
+`migration_interval` générations, elle dépose ses meilleurs individus, compactés
+bit à bit, dans son emplacement d'un tampon en mémoire partagée, puis remplace
+ses pires individus par les meilleurs migrants de ses îles sources (selon la
+topologie). Les îles ne s'attendent pas: seuls les migrants transitent, jamais
+les populations entières.
+"""
+import multiprocessing
+import os
+import queue
+import time
+
+import numpy as np
+
+from helpers import _genetic_solve
+
+TOPOLOGIES = ('ring', 'complete', 'random')
+# Délai laissé aux îles après l'échéance pour renvoyer leur meilleur individu (s)
+ISLAND_GRACE = 1.0
+# Points conservés par trace de convergence (le résumé reste petit quel que soit le nombre de générations)
+TRACE_POINTS = 200
+# Individus par île: le double du génétique simple (50), car les migrants remplacent une part de chaque population
+ISLAND_POPULATION_SIZE = 100
+
+
+def _sources(topology, island, islands, rng):
+    """Îles dont `island` reçoit les migrants"""
+    if topology == 'ring':
+        return [(island - 1) % islands]
+    if topology == 'complete':
+        return [source for source in range(islands) if source != island]
+    # 'random': une autre île tirée à chaque migration
+    return [(island + int(rng.integers(1, islands))) % islands]
+
+
+def _sample(trace, points=TRACE_POINTS):
+    """Trace réduite à au plus `points` couples [génération, meilleure valeur], dernière génération incluse"""
+    kept = np.unique(np.linspace(0, len(trace) - 1, min(points, len(trace))).round().astype(int))
+    return [[int(i) + 1, round(trace[i], 2)] for i in kept.tolist()]
+
+
+def _island(island, islands, weights, values, capacity, settings, incumbent, time_limit, shared, locks,
+            messages):
+    """Fait évoluer une île dans son processus; son résultat passe par la file `messages`"""
+    deadline = None if time_limit is None else time.perf_counter() + time_limit
+    buffer, scores, epochs = shared
+    migrants, interval, topology = settings['migrants'], settings['migration_interval'], settings['topology']
+    buffer = np.frombuffer(buffer, dtype=np.uint8).reshape(islands, migrants, settings['words'])
+    scores = np.frombuffer(scores, dtype=np.float64).reshape(islands, migrants)
+    epochs = np.frombuffer(epochs, dtype=np.int64)
+    rng = np.random.default_rng(settings['seed'])
+    generations = settings['generations']
+
+    def migrate(generation, population, fitness):
+        if (generation + 1) % interval or islands < 2:
+            return population, fitness
+        # Émission: les meilleurs individus de l'île
+        ranking = np.argsort(-fitness, kind='stable')
+        with locks[island]:
+            buffer[island] = np.packbits(population[ranking[:migrants]], axis=1)
+            scores[island] = fitness[ranking[:migrants]]
+            epochs[island] += 1
+
+        # Réception: les meilleurs migrants des sources remplacent les pires individus
+        received, received_scores = [], []
+        for source in _sources(topology, island, islands, rng):
+            with locks[source]:
+                if epochs[source]:
+                    received.append(buffer[source].copy())
+                    received_scores.append(scores[source].copy())
+        if received:
+            received_scores = np.concatenate(received_scores)
+            best = np.argsort(-received_scores, kind='stable')[:migrants]
+            individuals = np.unpackbits(np.concatenate(received)[best], axis=1, count=population.shape[1])
+            worst = ranking[::-1][:len(best)]
+            population[worst] = individuals.astype(bool)
+            fitness[worst] = received_scores[best]
+        messages.put(('progress', island, generation + 1, float(fitness.max())))
+        return population, fitness
+
+    try:
+        trace = []
+        chosen = _genetic_solve(weights, values, capacity, settings['population_size'], generations,
+                                settings['mutation_rate'], rng, None, incumbent, deadline, migrate, trace)
+        messages.put(('done', island, chosen, float(values[chosen].sum()), trace))
+    except Exception as e:
+        messages.put(('error', island, str(e)))
+
+
+def solve_islands(weights, values, capacity, islands=None, topology='ring', migration_rate=0.1,
+                  migration_interval=10, population_size=ISLAND_POPULATION_SIZE, generations=100,
+                  mutation_rate=None, seed=None, progress=None, incumbent=None, time_limit=None):
+    """Algorithme génétique en `islands` processus (par défaut un par cœur); retourne (indices, statistiques).
+
+    `topology` fixe les échanges: 'ring' (de l'île précédente), 'complete'
+    (de toutes les autres) ou 'random' (d'une île tirée à chaque migration).
+    `migration_rate` est la part de la population qui migre toutes les
+    `migration_interval` générations. Chaque île fait évoluer
+    `population_size` individus: la recherche porte sur islands x
+    population_size individus, contre 50 pour le génétique simple.
+    `incumbent` est placé dans la première île. Les statistiques donnent
+    l'île gagnante et, par île, la meilleure fitness au fil des générations
+    (`traces`: couples [génération, valeur], au plus TRACE_POINTS par île).
+    """
+    if topology not in TOPOLOGIES:
+        raise ValueError(f"topologie inconnue: {topology} (attendu: {', '.join(TOPOLOGIES)})")
+    islands = max(int(islands or os.cpu_count() or 1), 1)
+    migration_interval = max(int(migration_interval), 1)
+    migrants = min(max(int(round(migration_rate * population_size)), 1), max(population_size // 2, 1))
+    start = time.perf_counter()
+    deadline = None if time_limit is None else start + time_limit
+
+    # Tampon de migration: un emplacement par île (individus compactés, fitness, compteur d'émissions)
+    words = (int(np.count_nonzero((values > 0) & (weights <= capacity))) + 7) // 8
+    context = multiprocessing.get_context()
+    shared = (context.RawArray('B', islands * migrants * words),
+              context.RawArray('d', islands * migrants),
+              context.RawArray('q', islands))
+    locks = [context.Lock() for _ in range(islands)]
+    messages = context.Queue()
+    seeds = np.random.SeedSequence(seed).spawn(islands)
+    workers = []
+    for island in range(islands):
+        settings = {'migrants': migrants, 'words': words, 'migration_interval': migration_interval,
+                    'topology': topology, 'seed': seeds[island], 'population_size': population_size,
+                    'generations': generations, 'mutation_rate': mutation_rate}
+        workers.append(context.Process(
+            target=_island, daemon=True,
+            args=(island, islands, weights, values, capacity, settings, incumbent if island == 0 else None,
+                  None if deadline is None else max(deadline - time.perf_counter(), 0.001), shared, locks,
+                  messages)))
+    for worker in workers:
+        worker.start()
+
+    chosen, best_value, best_island = np.empty(0, dtype=np.intp), -np.inf, None
+    traces = [[] for _ in range(islands)]
+    status = ['stopped'] * islands
+    running = set(range(islands))
+    try:
+        while running:
+            wait = 0.1
+            if deadline is not None:
+                wait = min(wait, deadline + ISLAND_GRACE - time.perf_counter())
+                if wait <= 0:
+                    break
+            try:
+                message = messages.get(timeout=wait)
+            except queue.Empty:
+                # Une île morte sans message n'est plus attendue
+                for island in list(running):
+                    if workers[island].exitcode not in (None, 0):
+                        running.discard(island)
+                        status[island] = 'crashed'
+                continue
+
+            kind, island = message[:2]
+            if kind == 'progress':
+                if progress is not None:
+                    progress({'island': island, 'generation': message[2], 'generations': generations,
+                              'best_value': max(message[3], best_value)})
+                continue
+            running.discard(island)
+            if kind == 'error':
+                status[island] = 'error'
+                continue
+            island_chosen, value, traces[island] = message[2:]
+            status[island] = 'done'
+            if value > best_value:
+                chosen, best_value, best_island = island_chosen, value, island
+    finally:
+        for worker in workers:
+            if worker.is_alive():
+                worker.terminate()
+        for worker in workers:
+            worker.join(1.0)
+        messages.close()
+        messages.cancel_join_thread()
+
+    if best_island is None:
+        raise RuntimeError("aucune île n'a retourné de solution")
+    stats = {
+        'islands': islands,
+        'topology': topology,
+        'migrants': migrants,
+        'migration_interval': migration_interval,
+        'best_island': best_island,
+        'island_status': status,
+        'traces': [_sample(trace) for trace in traces],
+    }
+    return np.sort(np.asarray(chosen, dtype=np.intp)), stats
+
+
+def run_islands(df, max_capacity, params, progress, timings, incumbent, resume, state, deadline):
+    """Moteur 'genetic_islands' du registre (algorithms.py); `params` est transmis à solve_islands"""
+    time_limit = None if deadline is None else max(deadline - time.perf_counter(), 0.001)
+    return solve_islands(df['weight'].to_numpy(dtype=float), df['value'].to_numpy(dtype=float), max_capacity,
+                         progress=progress, incumbent=incumbent, time_limit=time_limit, **params)
@@ -0,0 +1,78 @@
+"""Résolutions en tâche de fond: gestionnaire Dash, limite de concurrence et progression.
+
+Modèle de processus: DiskcacheManager exécute chaque callback en arrière-plan
+dans un processus créé pour l'occasion (fork du serveur), qui se termine avec
+la résolution. Rien de ce qu'une résolution garde en mémoire ne profite donc à
+la suivante: l'état partagé entre résolutions (solutions en cache, jeux
+d'objets, sélections et états de la programmation dynamique, compteurs,
+emplacements de calcul) vit dans les stockages disque (sqlite, diskcache).
+"""
+from contextlib import contextmanager
+import os
+import time
+
+import diskcache
+import psutil
+from dash import DiskcacheManager
+
+
+def create_background_manager(directory):
+    """Gestionnaire de callbacks en arrière-plan adossé à un cache disque local"""
+    cache = diskcache.Cache(directory)
+    return DiskcacheManager(cache), cache
+
+
+class SolveSlots:
+    """Nombre borné de résolutions simultanées, partagé entre processus.
+
+    Chaque emplacement est une clé du cache disque contenant le PID de son
+    détenteur; l'emplacement d'un processus tué (annulation) est récupéré dès
+    que son PID n'existe plus.
+    """
+
+    def __init__(self, cache, limit, poll_interval=0.2):
+        self.cache = cache
+        self.limit = max(int(limit), 1)
+        self.poll_interval = poll_interval
+
+    def _try_acquire(self):
+        for slot in range(self.limit):
+            key = f'solve-slot-{slot}'
+            if self.cache.add(key, os.getpid()):
+                return key
+            holder = self.cache.get(key)
+            if holder is not None and not psutil.pid_exists(holder):
+                with self.cache.transact():
+                    if self.cache.get(key) == holder:
+                        self.cache.delete(key)
+                if self.cache.add(key, os.getpid()):
+                    return key
+        return None
+
+    @contextmanager
+    def acquire(self, on_wait=None):
+        """Attend un emplacement libre; `on_wait` est appelé pendant l'attente"""
+        key = self._try_acquire()
+        while key is None:
+            if on_wait is not None:
+                on_wait()
+            time.sleep(self.poll_interval)
+            key = self._try_acquire()
+        try:
+            yield
+        finally:
+            self.cache.delete(key)
+
+
+def throttled(callback, interval):
+    """Limite la fréquence des appels de `callback` (le premier passe toujours)"""
+    last_call = None
+
+    def wrapper(*args):
+        nonlocal last_call
+        now = time.monotonic()
+        if last_call is None or now - last_call >= interval:
+            last_call = now
+            callback(*args)
+
+    return wrapper
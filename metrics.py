@@ -0,0 +1,106 @@
+"""Instrumentation des résolutions: durées par phase et export au format Prometheus"""
+from bisect import bisect_left
+from contextlib import contextmanager
+import time
+
+# Bornes supérieures (s) des classes des histogrammes de durée
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Métriques exposées: nom -> (type, description)
+METRICS = {
+    'knapsack_phase_seconds': ('histogram', "Durée des phases d'une résolution (s)"),
+    'knapsack_solves_total': ('counter', "Résolutions servies, par algorithme effectif"),
+    'knapsack_fallbacks_total': ('counter', "Résolutions repliées sur un algorithme approché"),
+    'knapsack_solution_cache_total': ('counter', "Accès au cache des solutions, par événement (hit, disk_hit, miss...)"),
+    'knapsack_incremental_total': ('counter', "Ré-optimisations après modification, par mode (skipped, dp_resume, warm_start)"),
+}
+
+
+@contextmanager
+def timed(timings, phase):
+    """Ajoute la durée du bloc à `timings[phase]` (en secondes)"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[phase] = timings.get(phase, 0.0) + time.perf_counter() - start
+
+
+def _format_labels(labels):
+    return '{' + ','.join(f'{name}="{value}"' for name, value in labels) + '}' if labels else ''
+
+
+class Metrics:
+    """Compteurs et histogrammes partagés entre processus.
+
+    Les valeurs sont des entiers incrémentés atomiquement dans un cache
+    diskcache (celui des tâches de fond), si bien que les résolutions faites
+    dans les processus des callbacks en arrière-plan sont visibles du serveur
+    qui sert /metrics. Les sommes de durées sont stockées en microsecondes.
+    """
+
+    def __init__(self, cache):
+        self.cache = cache
+
+    def inc(self, name, labels=None, amount=1):
+        """Incrémente un compteur"""
+        self.cache.incr(('metrics', name, '', tuple(sorted((labels or {}).items()))), amount)
+
+    def observe(self, name, seconds, labels=None):
+        """Ajoute une durée à un histogramme"""
+        labels = tuple(sorted((labels or {}).items()))
+        position = bisect_left(BUCKETS, seconds)
+        bucket = repr(BUCKETS[position]) if position < len(BUCKETS) else '+Inf'
+        with self.cache.transact():
+            self.cache.incr(('metrics', name, 'bucket', labels + (('le', bucket),)))
+            self.cache.incr(('metrics', name, 'sum', labels), int(round(seconds * 1e6)))
+            self.cache.incr(('metrics', name, 'count', labels))
+
+    def record_solve(self, summary):
+        """Enregistre le résumé d'une résolution (run_optimization)"""
+        algorithm = summary['algorithm']
+        requested = summary.get('requested_algorithm', algorithm)
+        self.inc('knapsack_solves_total', {'algorithm': algorithm,
+                                           'cache_hit': str(bool(summary.get('cache_hit'))).lower()})
+        if summary.get('fallback'):
+            self.inc('knapsack_fallbacks_total', {'requested': requested, 'algorithm': algorithm})
+        if summary.get('incremental'):
+            self.inc('knapsack_incremental_total', {'mode': summary['incremental']})
+        for phase, seconds in summary.get('timings', {}).items():
+            self.observe('knapsack_phase_seconds', seconds, {'phase': phase, 'algorithm': algorithm})
+
+    def _series(self):
+        """Valeurs brutes regroupées par métrique"""
+        series = {}
+        for key in list(self.cache.iterkeys()):
+            if isinstance(key, tuple) and len(key) == 4 and key[0] == 'metrics':
+                value = self.cache.get(key)
+                if value is not None:
+                    _, name, suffix, labels = key
+                    series.setdefault(name, {})[suffix, labels] = value
+        return series
+
+    def render(self):
+        """Texte au format d'exposition Prometheus (version 0.0.4)"""
+        series = self._series()
+        lines = []
+        for name, (kind, description) in METRICS.items():
+            lines.append(f'# HELP {name} {description}')
+            lines.append(f'# TYPE {name} {kind}')
+            values = series.get(name, {})
+            if kind == 'counter':
+                for (_, labels), value in sorted(values.items()):
+                    lines.append(f'{name}{_format_labels(labels)} {value}')
+                continue
+
+            for (suffix, labels), count in sorted(values.items()):
+                if suffix != 'count':
+                    continue
+                # Les classes sont stockées séparément: cumul pour l'exposition
+                cumulative = 0
+                for bound in [repr(b) for b in BUCKETS] + ['+Inf']:
+                    cumulative += values.get(('bucket', labels + (('le', bound),)), 0)
+                    lines.append(f'{name}_bucket{_format_labels(labels + (("le", bound),))} {cumulative}')
+                lines.append(f'{name}_sum{_format_labels(labels)} {values.get(("sum", labels), 0) / 1e6}')
+                lines.append(f'{name}_count{_format_labels(labels)} {count}')
+        return '\n'.join(lines) + '\n'
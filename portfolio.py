@@ -0,0 +1,242 @@
+"""Portefeuille d'algorithmes: plusieurs moteurs en parallèle sur la même instance.
+
+Le glouton fournit immédiatement la solution de départ de tous les moteurs;
+les autres (génétique, programmation dynamique si la table tient en mémoire,
+MIP GLPK, séparation et évaluation) tournent chacun dans un processus. Les
+processus envoient leurs nouvelles meilleures valeurs et bornes au processus
+parent, qui combine la meilleure solution connue et la meilleure borne prouvée:
+tous les moteurs sont arrêtés dès que l'optimalité est prouvée, ou à l'échéance.
+
+La meilleure solution connue (valeur et vecteur de décision) est partagée en
+mémoire (SharedIncumbent) pendant toute la résolution: la séparation et
+évaluation et le génétique y publient leurs améliorations, le parent y publie
+les solutions des autres moteurs, et les deux premiers y reprennent, l'une sa
+borne d'élagage, l'autre un individu de sa population. Une solution publiée
+reste acquise même si son moteur est arrêté avant d'avoir terminé.
+"""
+import multiprocessing
+import queue
+import time
+
+import numpy as np
+import pandas as pd
+
+from config import PORTFOLIO_ENGINES
+from helpers import DP_MAX_CELLS, EXACT_ALGORITHMS, _solve, _upper_bound, _warm_start
+
+# Délai laissé aux moteurs après l'échéance pour renvoyer leur meilleure solution (s)
+PORTFOLIO_GRACE = 1.0
+# Moteurs qui lisent et publient la solution partagée pendant leur recherche (paramètre `shared`)
+SHARED_ENGINES = ('branch_bound', 'genetic')
+
+
+class SharedIncumbent:
+    """Meilleure solution connue, en mémoire partagée entre les processus du portefeuille.
+
+    La valeur, le vecteur de décision (un octet par objet), le moteur qui l'a
+    trouvée et l'instant (time.perf_counter) sont modifiés ensemble sous un
+    verrou; la valeur seule se lit sans copier le vecteur.
+    """
+
+    def __init__(self, context, engines, num_items):
+        self._engines = list(engines)
+        self._value = context.Value('d', -np.inf)
+        self._selected = context.RawArray('b', max(num_items, 1))
+        self._origin = context.RawArray('d', 2)
+        self.engine = None
+
+    @property
+    def value(self):
+        return self._value.value
+
+    def publish(self, chosen, value, engine=None):
+        """Retient la solution `chosen` si elle améliore la solution partagée; indique si c'est le cas"""
+        with self._value.get_lock():
+            if value <= self._value.value:
+                return False
+            selected = np.frombuffer(self._selected, dtype=np.int8)
+            selected[:] = 0
+            selected[np.asarray(chosen, dtype=np.intp)] = 1
+            self._origin[:] = [self._engines.index(engine or self.engine), time.perf_counter()]
+            self._value.value = value
+            return True
+
+    def read(self):
+        """(valeur, indices choisis) de la solution partagée"""
+        with self._value.get_lock():
+            return self._value.value, np.flatnonzero(np.frombuffer(self._selected, dtype=np.int8))
+
+    def origin(self):
+        """(moteur, instant) de la solution partagée"""
+        with self._value.get_lock():
+            return self._engines[int(self._origin[0])], self._origin[1]
+
+
+def dp_fits(weights, capacity):
+    """Indique si la programmation dynamique peut traiter l'instance (poids entiers, table bornée)"""
+    return capacity >= 0 and bool(np.all(np.mod(weights, 1) == 0)) \
+        and len(weights) * (int(np.floor(capacity)) + 1) <= DP_MAX_CELLS
+
+
+def _worker(engine, weights, values, capacity, incumbent, time_limit, params, shared, messages):
+    """Exécute un moteur dans son processus; ses résultats passent par la file `messages`"""
+    start = time.perf_counter()
+    if engine in SHARED_ENGINES:
+        shared.engine = engine
+        params = dict(params, shared=shared)
+    deadline = None if time_limit is None else start + time_limit
+    best_value, best_bound = -np.inf, np.inf
+
+    def progress(info):
+        nonlocal best_value, best_bound
+        value, bound = info.get('best_value'), info.get('bound')
+        improved = value is not None and value > best_value
+        tightened = bound is not None and bound < best_bound
+        if improved or tightened:
+            best_value = max(best_value, value) if value is not None else best_value
+            best_bound = min(best_bound, bound) if bound is not None else best_bound
+            messages.put(('progress', engine, value if improved else None, bound if tightened else None))
+
+    try:
+        df = pd.DataFrame({'weight': weights, 'value': values})
+        chosen, algorithm, stats, fallback = _solve(df, capacity, engine, params, progress, {}, incumbent,
+                                                    deadline=deadline)
+        chosen = np.asarray(chosen, dtype=np.intp)
+        optimal = algorithm in EXACT_ALGORITHMS and not fallback and bool(stats.get('optimal', True))
+        messages.put(('done', engine, chosen, float(values[chosen].sum()), optimal, stats.get('bound')))
+    except Exception as e:
+        messages.put(('error', engine, str(e)))
+
+
+def solve_portfolio(weights, values, capacity, engines=None, time_limit=None, params=None, progress=None,
+                    incumbent=None):
+    """Résout l'instance avec plusieurs moteurs en parallèle; retourne (indices, statistiques).
+
+    `engines` (par défaut PORTFOLIO_ENGINES) liste les moteurs lancés en plus
+    du glouton, `params` leurs paramètres ({moteur: dict}) et `incumbent` une
+    solution connue. `progress` reçoit le moteur à l'origine de chaque
+    amélioration, la meilleure valeur et la meilleure borne. Les statistiques
+    indiquent le moteur gagnant (`winner`: premier à avoir trouvé la solution
+    retenue) et son temps, le moteur qui a prouvé l'optimalité (`proved_by`)
+    et, par moteur, la valeur, le temps et l'issue (valeur de sa propre
+    résolution, qui peut reprendre une solution publiée par un autre moteur).
+    """
+    start = time.perf_counter()
+    deadline = None if time_limit is None else start + time_limit
+    params = params or {}
+    integral = bool(np.all(np.mod(values, 1) == 0))
+    tol = 1e-9 * max(1.0, float(np.abs(values).sum()))
+
+    chosen = _warm_start(weights, values, capacity, () if incumbent is None else (incumbent,))
+    best_value = float(values[chosen].sum())
+    elapsed = time.perf_counter() - start
+    proved_by = None
+    report = {'greedy': {'value': best_value, 'time': round(elapsed, 6), 'status': 'done'}}
+    bound = np.inf
+    engines = [engine for engine in (engines or PORTFOLIO_ENGINES)
+               if engine != 'dynamic' or dp_fits(weights, capacity)]
+    context = multiprocessing.get_context()
+    shared = SharedIncumbent(context, ['greedy', *engines], len(weights))
+    shared.publish(chosen, best_value, 'greedy')
+
+    def tighten(new_bound, engine):
+        """Retient une borne plus serrée; `engine` prouve l'optimalité si l'écart se ferme"""
+        nonlocal bound, proved_by
+        if new_bound is not None:
+            if integral:
+                new_bound = np.floor(new_bound + 1e-9)
+            bound = min(bound, float(new_bound))
+        if proved_by is None and best_value >= bound - tol:
+            proved_by = engine
+
+    tighten(_upper_bound(weights, values, capacity), 'greedy')
+    if best_value < bound - tol and engines:
+        messages = context.Queue()
+        workers = {
+            engine: context.Process(
+                target=_worker, daemon=True,
+                args=(engine, weights, values, capacity, chosen,
+                      None if deadline is None else max(deadline - time.perf_counter(), 0.001),
+                      params.get(engine, {}), shared, messages))
+            for engine in engines
+        }
+        for worker in workers.values():
+            worker.start()
+        running = set(workers)
+        live_value = best_value
+        try:
+            while running and best_value < bound - tol:
+                wait = 0.1
+                if deadline is not None:
+                    wait = min(wait, deadline + PORTFOLIO_GRACE - time.perf_counter())
+                    if wait <= 0:
+                        break
+                try:
+                    message = messages.get(timeout=wait)
+                except queue.Empty:
+                    # Un processus mort sans message (mémoire épuisée...) n'est plus attendu
+                    for engine in list(running):
+                        if workers[engine].exitcode not in (None, 0):
+                            running.discard(engine)
+                            report[engine] = {'value': None, 'time': None, 'status': 'crashed'}
+                    continue
+
+                kind, engine = message[:2]
+                now = time.perf_counter() - start
+                # Solutions publiées directement en mémoire partagée par les moteurs
+                best_value = max(best_value, shared.value)
+                if kind == 'progress':
+                    value, new_bound = message[2:]
+                    tighten(new_bound, engine)
+                    if value is not None and value > live_value:
+                        live_value = value
+                    if progress is not None:
+                        progress({'engine': engine, 'best_value': max(live_value, best_value), 'bound': bound})
+                    continue
+
+                running.discard(engine)
+                if kind == 'error':
+                    report[engine] = {'value': None, 'time': round(now, 6), 'status': 'error', 'error': message[2]}
+                    continue
+                engine_chosen, value, optimal, engine_bound = message[2:]
+                report[engine] = {'value': value, 'time': round(now, 6),
+                                  'status': 'optimal' if optimal else 'done'}
+                shared.publish(engine_chosen, value, engine)
+                best_value = max(best_value, value)
+                live_value = max(live_value, value)
+                tighten(value if optimal else engine_bound, engine)
+                if progress is not None:
+                    progress({'engine': engine, 'best_value': best_value, 'bound': bound})
+        finally:
+            for engine, worker in workers.items():
+                if worker.is_alive():
+                    worker.terminate()
+                    report.setdefault(engine, {'value': None, 'time': None, 'status': 'stopped'})
+            for worker in workers.values():
+                worker.join(1.0)
+            messages.close()
+            messages.cancel_join_thread()
+
+    # Solution retenue: la meilleure publiée, avec le moteur qui l'a trouvée en premier
+    best_value, chosen = shared.read()
+    winner, found_at = shared.origin()
+    winner_time = found_at - start
+    tighten(None, winner)
+    optimal = best_value >= bound - tol
+    stats = {
+        'winner': winner,
+        'winner_time': round(winner_time, 6),
+        'proved_by': proved_by if optimal else None,
+        'engines': report,
+        'optimal': optimal,
+    }
+    if not optimal:
+        stats['bound'] = bound
+    return np.sort(np.asarray(chosen, dtype=np.intp)), stats
+
+
+def run_portfolio(df, max_capacity, params, progress, timings, incumbent, resume, state, deadline):
+    """Moteur 'portfolio' du registre (algorithms.py)"""
+    time_limit = None if deadline is None else max(deadline - time.perf_counter(), 0.001)
+    return solve_portfolio(df['weight'].to_numpy(dtype=float), df['value'].to_numpy(dtype=float), max_capacity,
+                           time_limit=time_limit, params=params, progress=progress, incumbent=incumbent)